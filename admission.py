@@ -0,0 +1,144 @@
+"""
+Admission control and request deadlines.
+
+Expensive routes run in small per-process pools so they can't take every
+gunicorn thread: when a pool is full a request waits in a bounded queue
+for up to ADMISSION_WAIT_MS, and is refused with 503 + Retry-After when
+the queue is full or the wait runs out. Routes without a pool (the cached
+public reads) are never queued.
+
+Every admitted request gets a deadline of REQUEST_DEADLINE_MS. It is
+applied to MongoDB through ``pymongo.timeout`` (which sets maxTimeMS on
+each operation and fails fast once the budget is spent) and used as the
+SMTP socket timeout, so work stops once the client has given up.
+"""
+
+import os
+import threading
+import time
+
+import pymongo
+from flask import g, has_app_context, jsonify, request
+
+import metrics
+
+# Seconds a request may run before its MongoDB and SMTP calls are cut off.
+REQUEST_DEADLINE_MS = int(os.environ.get('REQUEST_DEADLINE_MS', 10000))
+# Longest a request waits for a slot in a full pool.
+ADMISSION_WAIT_MS = int(os.environ.get('ADMISSION_WAIT_MS', 2000))
+# Requests allowed to wait for each pool; more are refused at once.
+ADMISSION_QUEUE_SIZE = int(os.environ.get('ADMISSION_QUEUE_SIZE', 4))
+# Seconds clients are told to wait after a 503.
+ADMISSION_RETRY_AFTER = 5
+BUSY_ERROR = "Server is busy. Please try again shortly."
+
+# Concurrent requests per process for each pool.
+POOL_LIMITS = {
+    'contact': int(os.environ.get('CONTACT_CONCURRENCY', 2)),
+    'admin_contacts': int(os.environ.get('ADMIN_CONTACTS_CONCURRENCY', 2)),
+}
+
+# Flask endpoint -> pool; endpoints not listed are admitted immediately.
+ROUTE_POOLS = {
+    'contact': 'contact',
+    'get_contacts': 'admin_contacts',
+    'export_contacts': 'admin_contacts',
+    'get_unread_count': 'admin_contacts',
+    'bulk_update_contacts': 'admin_contacts',
+    'mark_contact_read': 'admin_contacts',
+}
+
+# Streaming endpoints run for as long as the client reads; no deadline.
+NO_DEADLINE = {'export_contacts', 'stream_contacts', 'static_files'}
+
+
+class AdmissionPool:
+    """Counting semaphore with a bounded number of waiters."""
+
+    def __init__(self, name, limit, queue_size=ADMISSION_QUEUE_SIZE):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout):
+        """True once a slot is held; False if the queue is full or ``timeout`` passes."""
+        with self._condition:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue_size:
+                return False
+            self.waiting += 1
+            try:
+                admitted = self._condition.wait_for(lambda: self.active < self.limit, timeout)
+            finally:
+                self.waiting -= 1
+            if admitted:
+                self.active += 1
+            return admitted
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+pools = {name: AdmissionPool(name, limit) for name, limit in POOL_LIMITS.items()}
+
+
+def remaining_seconds(default=None):
+    """Seconds left before the current request's deadline, or ``default`` outside one."""
+    deadline = g.get('deadline') if has_app_context() else None
+    if deadline is None:
+        return default
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def pool_for(endpoint):
+    """The endpoint's AdmissionPool, or None if it is admitted immediately."""
+    return pools.get(ROUTE_POOLS.get(endpoint))
+
+
+def count_rejection(pool):
+    metrics.incr('admission_rejected')
+    metrics.incr(f'admission_rejected_{pool.name}')
+
+
+def _rejected(pool):
+    count_rejection(pool)
+    response = jsonify({"error": BUSY_ERROR})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(ADMISSION_RETRY_AFTER)
+    return response
+
+
+def _before_request():
+    pool = pool_for(request.endpoint)
+    if pool is not None:
+        started = time.monotonic()
+        if not pool.acquire(ADMISSION_WAIT_MS / 1000):
+            return _rejected(pool)
+        g.admission_pool = pool
+        metrics.incr('admission_wait_ms', int((time.monotonic() - started) * 1000))
+
+    if request.endpoint not in NO_DEADLINE:
+        g.deadline = time.monotonic() + REQUEST_DEADLINE_MS / 1000
+        g.mongo_timeout = pymongo.timeout(REQUEST_DEADLINE_MS / 1000)
+        g.mongo_timeout.__enter__()
+
+
+def _teardown_request(exc):
+    mongo_timeout = g.pop('mongo_timeout', None)
+    if mongo_timeout is not None:
+        mongo_timeout.__exit__(None, None, None)
+    pool = g.pop('admission_pool', None)
+    if pool is not None:
+        pool.release()
+
+
+def init_admission(app):
+    app.before_request(_before_request)
+    app.teardown_request(_teardown_request)
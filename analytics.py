@@ -0,0 +1,181 @@
+"""
+Write-behind view counters.
+
+Public GET requests are counted in memory per (tenant, kind, name, hour)
+and a background thread flushes them every ANALYTICS_FLUSH_INTERVAL
+seconds as a single unordered bulk_write of $inc upserts into the
+``analytics`` collection, one document per hourly bucket. Counts still
+in memory are flushed at exit and from gunicorn's worker_exit hook.
+
+Kinds:
+    page     hits per public route (the URL rule, e.g. /api/projects/<project_id>)
+    project  views of a single project, by id
+
+Nothing is counted under app.testing or with ANALYTICS_DISABLED=1, which
+the scripts that render the API in-process (export_static.py,
+profile_startup.py, check_query_budgets.py) set.
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app, request
+from pymongo import UpdateOne
+
+import metrics
+from models import mongo
+from tenancy import current_tenant, scoped
+
+ANALYTICS_COLLECTION = 'analytics'
+ANALYTICS_KINDS = ('page', 'project')
+# Seconds between flushes to MongoDB.
+ANALYTICS_FLUSH_INTERVAL = float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', 10))
+# Distinct counters held in memory; beyond this new keys wait for a flush.
+MAX_PENDING_KEYS = 10000
+# Furthest back /api/admin/analytics will read.
+MAX_ANALYTICS_DAYS = 90
+# Set to 1 to count nothing, e.g. for requests made by export scripts.
+ANALYTICS_DISABLED = os.environ.get('ANALYTICS_DISABLED') == '1'
+
+
+def bucket_start(when=None):
+    """Start of the hourly bucket containing ``when``."""
+    return (when or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+
+
+def bucket_id(tenant_id, kind, name, bucket):
+    return f"{tenant_id}:{kind}:{name}:{bucket:%Y%m%d%H}"
+
+
+class CounterAggregator:
+    """Thread-safe in-memory counts, drained by ``flush``."""
+
+    def __init__(self, interval=ANALYTICS_FLUSH_INTERVAL, max_keys=MAX_PENDING_KEYS):
+        self.interval = interval
+        self.max_keys = max_keys
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def incr(self, kind, name, amount=1, tenant_id=None):
+        key = (tenant_id or current_tenant(), kind, name, bucket_start())
+        with self._lock:
+            if key not in self._counts and len(self._counts) >= self.max_keys:
+                metrics.incr('analytics_dropped')
+                return
+            self._counts[key] += amount
+        self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        # Threads don't survive fork, so each worker starts its own.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='analytics-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                pass  # counts were put back; try again next interval
+
+    def flush(self, db=None):
+        """Write pending counts with one bulk_write. Returns documents touched."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._counts = self._counts, Counter()
+            if not pending:
+                return 0
+            requests = [
+                UpdateOne(
+                    {'_id': bucket_id(tenant_id, kind, name, bucket)},
+                    {
+                        '$inc': {'count': count},
+                        '$setOnInsert': {
+                            'tenant_id': tenant_id, 'kind': kind, 'name': name, 'bucket': bucket,
+                        },
+                    },
+                    upsert=True,
+                )
+                for (tenant_id, kind, name, bucket), count in pending.items()
+            ]
+            try:
+                (db if db is not None else mongo.db)[ANALYTICS_COLLECTION].bulk_write(
+                    requests, ordered=False
+                )
+            except Exception:
+                # Put the counts back so the next flush retries them.
+                with self._lock:
+                    self._counts.update(pending)
+                metrics.incr('analytics_flush_errors')
+                raise
+            metrics.incr('analytics_flushes')
+            return len(requests)
+
+
+counters = CounterAggregator()
+
+
+def _flush_at_exit():
+    if counters._pid == os.getpid():
+        try:
+            counters.flush()
+        except Exception:
+            pass
+
+
+atexit.register(_flush_at_exit)
+
+
+def record_request(rule, view_args, status, tenant_id=None):
+    """Count a successful GET of a public API route (by its URL rule)."""
+    if ANALYTICS_DISABLED or status != 200 or not rule.startswith('/api/') or rule.startswith('/api/admin/'):
+        return
+    counters.incr('page', rule, tenant_id=tenant_id)
+    if rule == '/api/projects/<project_id>' and view_args.get('project_id'):
+        counters.incr('project', view_args['project_id'], tenant_id=tenant_id)
+
+
+def _after_request(response):
+    if current_app.testing:
+        return response
+    if request.method == 'GET' and request.url_rule is not None:
+        record_request(request.url_rule.rule, request.view_args or {}, response.status_code)
+    return response
+
+
+def init_analytics(app):
+    app.after_request(_after_request)
+
+
+def read_analytics(db, kind, days=7):
+    """Totals per name and per day for the current tenant, newest day first."""
+    since = bucket_start() - timedelta(days=days)
+    match = {'$match': scoped({'kind': kind, 'bucket': {'$gte': since}})}
+    totals = db[ANALYTICS_COLLECTION].aggregate([
+        match,
+        {'$group': {'_id': '$name', 'count': {'$sum': '$count'}}},
+        {'$sort': {'count': -1}},
+    ])
+    by_day = Counter()
+    buckets = db[ANALYTICS_COLLECTION].find(match['$match'], {'bucket': 1, 'count': 1})
+    for doc in buckets:
+        by_day[doc['bucket'].date().isoformat()] += doc['count']
+    return {
+        'kind': kind,
+        'since': since.isoformat(),
+        'totals': [{'name': t['_id'], 'count': t['count']} for t in totals],
+        'daily': [{'date': day, 'count': by_day[day]} for day in sorted(by_day, reverse=True)],
+    }
@@ -1,18 +1,41 @@
-from flask import Flask, jsonify, request, send_from_directory
-from flask_cors import CORS
-from flask_mail import Mail, Message
-from models import mongo, serialize_doc, calculate_duration
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+from admission import init_admission, remaining_seconds
+from models import mongo, serialize_doc, format_project, format_experience, format_skill, parse_object_ids
+from compression import init_compression
+from cors import init_cors
+from request_log import init_request_logging, logger
+from profiling import init_profiling
+from rate_limit import allow_confirmation, contact_rate_limit
+from spam import classify, is_duplicate, release_fingerprint
+from response_cache import cached
+from skills_view import get_view as get_skills_view
+from retention import apply_retention, expire_contacts, read_expiry
+from static_assets import serve_static
+from analytics import ANALYTICS_KINDS, MAX_ANALYTICS_DAYS, init_analytics, read_analytics
+from contact_stream import (
+    STREAM_BUSY_ERROR, STREAM_BUSY_RETRY_AFTER, STREAM_HEADERS, contact_events, current_version, notifier,
+    resume_version, stream_slots,
+)
+from versioning import changes_since, parse_since, record_deletes, versioned_write
+from tenancy import DEFAULT_TENANT, TENANCY_MODE, current_tenant, init_tenancy, scoped
+import metrics
+import repositories
+from repositories import contacts_query, experience_query, projects_query
 from bson.objectid import ObjectId
 import os
 from datetime import datetime
 import re
+import csv
+import io
+import json
+import zlib
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
+# static_files() below serves /static/ instead of the built-in route.
+app = Flask(__name__, static_folder=None)
 
 # Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
@@ -26,10 +49,20 @@ app.config['MAIL_PORT'] = 587
 app.config['MAIL_USE_TLS'] = True
 app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
+# SMTP socket timeout (seconds) outside a request deadline.
+SMTP_TIMEOUT = 10
+# Below this many seconds left, notification emails are skipped.
+MIN_SMTP_TIMEOUT = 1
 
-# Initialize extensions
+# Initialize extensions; Flask-Mail is set up by mailer.py on first send
 mongo.init_app(app)
-mail = Mail(app)
+init_tenancy(app)
+init_cors(app)
+init_compression(app)
+init_request_logging(app)
+init_admission(app)
+init_analytics(app)
+init_profiling(app)
 
 
 # ---------- Keep-alive (Render free tier) ----------
@@ -56,6 +89,70 @@ def keep_alive():
     print("Keep-alive thread started")
 
 
+STATS_SETTINGS = ('github_repos_count', 'coffee_cups_count')
+
+
+def build_stats(projects_count, developer, technologies_count, github_repos, coffee_cups):
+    return {
+        "projects_completed": projects_count,
+        "years_experience": developer.get('experience_years', 0) if developer else 0,
+        "technologies_used": technologies_count,
+        "github_repos": int(github_repos['value']) if github_repos else 25,
+        "coffee_cups": int(coffee_cups['value']) if coffee_cups else 1247
+    }
+
+
+CONTACT_SUCCESS = {
+    "message": "Message sent successfully!",
+    "success": True,
+    "details": "I'll get back to you within 24-48 hours!"
+}
+
+
+def parse_contact(data):
+    """Validate a contact form payload.
+
+    Returns (document to insert, None) or (None, error message).
+    """
+    data = data or {}
+    name = data.get('name', '').strip()
+    email = data.get('email', '').strip()
+    subject = data.get('subject', '').strip()
+    message = data.get('message', '').strip()
+
+    if not all([name, email, subject, message]):
+        return None, "All fields are required"
+
+    # Basic email validation
+    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    if not re.match(email_pattern, email):
+        return None, "Please provide a valid email address"
+
+    return {
+        'tenant_id': current_tenant(),
+        'name': name,
+        'email': email,
+        'subject': subject,
+        'message': message,
+        'is_read': False,
+        'is_replied': False,
+        'created_at': datetime.utcnow()
+    }, None
+
+
+def delta_response(collection, query, formatter, sort=None):
+    """Response for ?since=<version>: changed documents and deleted ids.
+
+    Filters in ``query`` narrow ``upserted`` only; ``deleted`` lists every
+    deletion in the collection since that version.
+    """
+    try:
+        since = parse_since(request.args['since'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(changes_since(mongo.db, collection, since, query, formatter, sort))
+
+
 # ---------- Routes ----------
 
 @app.route('/')
@@ -71,7 +168,7 @@ def home():
 @app.route('/api/developer')
 def get_developer_info():
     try:
-        developer = mongo.db.developer.find_one()
+        developer = repositories.developer.get()
         if not developer:
             return jsonify({"error": "Developer information not found"}), 404
         return jsonify(serialize_doc(developer))
@@ -82,27 +179,12 @@ def get_developer_info():
 @app.route('/api/skills')
 def get_skills():
     try:
+        if 'since' in request.args:
+            return delta_response('skills', scoped(), format_skill, ('level', -1))
+        # Served from the in-memory view; category matching ignores case
         featured_only = request.args.get('featured', 'false').lower() == 'true'
-        category = request.args.get('category', '').strip()
-
-        query = {}
-
-        if featured_only:
-            query['is_featured'] = True
-
-        if category and category.lower() != 'all':
-            query['category'] = category
-
-        skills = list(mongo.db.skills.find(query).sort('level', -1))
-
-        result = []
-        for skill in skills:
-            doc = serialize_doc(skill)
-            # Add proficiency alias for frontend compatibility
-            doc['proficiency'] = doc.get('level', 0)
-            result.append(doc)
-
-        return jsonify(result)
+        category = request.args.get('category', '')
+        return jsonify(get_skills_view().select(featured_only, category))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -110,63 +192,88 @@ def get_skills():
 @app.route('/api/skills/categories')
 def get_skill_categories():
     try:
-        categories = mongo.db.skills.distinct('category')
-        category_list = [cat for cat in categories if cat]
-        return jsonify(sorted(category_list))
+        return jsonify(get_skills_view().categories)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+MAX_BATCH_IDS = 100
+
+
+def split_ids(value):
+    return [i.strip() for i in value.split(',') if i.strip()]
+
+
+def validate_project_ids(raw_ids):
+    """Returns (ObjectIds, None) or (None, error payload for a 400)."""
+    if not raw_ids:
+        return None, {"error": "No project ids given"}
+    if len(raw_ids) > MAX_BATCH_IDS:
+        return None, {"error": f"At most {MAX_BATCH_IDS} ids per request"}
+    ids, invalid = parse_object_ids(raw_ids)
+    if invalid:
+        return None, {"error": "Invalid project ids", "invalid_ids": invalid}
+    return ids, None
+
+
+def order_projects(ids, docs):
+    """Batch response in request order, listing ids that weren't found."""
+    found = {doc['_id']: doc for doc in docs}
+    return {
+        "projects": [format_project(found[oid]) for oid in ids if oid in found],
+        "missing": [str(oid) for oid in ids if oid not in found]
+    }
+
+
+def fetch_projects_by_ids(raw_ids):
+    """Fetch many projects with one $in query; returns (payload, status)."""
+    ids, error = validate_project_ids(raw_ids)
+    if error:
+        return error, 400
+    return order_projects(ids, repositories.projects.by_ids(ids)), 200
+
+
 @app.route('/api/projects')
+@cached()
 def get_projects():
     try:
-        featured_only = request.args.get('featured', 'false').lower() == 'true'
+        if 'ids' in request.args:
+            result, status = fetch_projects_by_ids(split_ids(request.args['ids']))
+            return jsonify(result), status
+
+        if 'since' in request.args:
+            return delta_response('projects', projects_query(request.args), format_project,
+                                  repositories.projects.sort)
+        projects = repositories.projects.list(request.args)
+        return jsonify([format_project(project) for project in projects])
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        query = {}
-        if featured_only:
-            query['featured'] = True
-
-        projects = list(mongo.db.projects.find(query).sort('created_at', -1))
-
-        result = []
-        for project in projects:
-            doc = serialize_doc(project)
-            # Ensure dates are serialized
-            if doc.get('start_date') and hasattr(doc['start_date'], 'isoformat'):
-                doc['start_date'] = doc['start_date'].isoformat()
-            if doc.get('end_date') and hasattr(doc['end_date'], 'isoformat'):
-                doc['end_date'] = doc['end_date'].isoformat()
-            if doc.get('created_at') and hasattr(doc['created_at'], 'isoformat'):
-                doc['created_date'] = doc['created_at'].isoformat()
-            elif doc.get('created_at'):
-                doc['created_date'] = doc['created_at']
-            # Ensure technologies is a list
-            doc.setdefault('technologies', [])
-            # Ensure images is a list
-            doc.setdefault('images', [])
-            result.append(doc)
 
-        return jsonify(result)
+@app.route('/api/projects/batch', methods=['POST'])
+def get_projects_batch():
+    """Same as /api/projects?ids=..., with the ids in a JSON body."""
+    try:
+        data = request.get_json(silent=True)
+        raw_ids = data.get('ids') if isinstance(data, dict) else None
+        if not isinstance(raw_ids, list):
+            return jsonify({"error": "'ids' must be a list"}), 400
+        result, status = fetch_projects_by_ids(raw_ids)
+        return jsonify(result), status
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route('/api/projects/<project_id>')
+@cached()
 def get_project(project_id):
     try:
-        project = mongo.db.projects.find_one({'_id': ObjectId(project_id)})
+        if not ObjectId.is_valid(project_id):
+            return jsonify({"error": "Invalid project id"}), 400
+        project = repositories.projects.get(ObjectId(project_id))
         if not project:
             return jsonify({"error": "Project not found"}), 404
-        doc = serialize_doc(project)
-        if doc.get('start_date') and hasattr(doc['start_date'], 'isoformat'):
-            doc['start_date'] = doc['start_date'].isoformat()
-        if doc.get('end_date') and hasattr(doc['end_date'], 'isoformat'):
-            doc['end_date'] = doc['end_date'].isoformat()
-        if doc.get('created_at') and hasattr(doc['created_at'], 'isoformat'):
-            doc['created_date'] = doc['created_at'].isoformat()
-        doc.setdefault('technologies', [])
-        doc.setdefault('images', [])
-        return jsonify(doc)
+        return jsonify(format_project(project))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -174,27 +281,11 @@ def get_project(project_id):
 @app.route('/api/experience')
 def get_experience():
     try:
-        experiences = list(mongo.db.experience.find().sort('start_date', -1))
-
-        result = []
-        for exp in experiences:
-            doc = serialize_doc(exp)
-            # Serialize dates
-            if doc.get('start_date') and hasattr(doc['start_date'], 'isoformat'):
-                doc['start_date'] = doc['start_date'].isoformat()
-            if doc.get('end_date') and hasattr(doc['end_date'], 'isoformat'):
-                doc['end_date'] = doc['end_date'].isoformat()
-            # Calculate duration
-            doc['duration'] = calculate_duration(
-                exp.get('start_date'),
-                exp.get('end_date')
-            )
-            # Ensure lists
-            doc.setdefault('technologies', [])
-            doc.setdefault('achievements', [])
-            result.append(doc)
-
-        return jsonify(result)
+        if 'since' in request.args:
+            return delta_response('experience', experience_query(request.args), format_experience,
+                                  repositories.experience.sort)
+        experiences = repositories.experience.list(request.args)
+        return jsonify([format_experience(exp) for exp in experiences])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -207,16 +298,10 @@ def get_experiences():
 @app.route('/api/education')
 def get_education():
     try:
-        education = list(mongo.db.education.find().sort('start_date', -1))
-        result = []
-        for edu in education:
-            doc = serialize_doc(edu)
-            if doc.get('start_date') and hasattr(doc['start_date'], 'isoformat'):
-                doc['start_date'] = doc['start_date'].isoformat()
-            if doc.get('end_date') and hasattr(doc['end_date'], 'isoformat'):
-                doc['end_date'] = doc['end_date'].isoformat()
-            result.append(doc)
-        return jsonify(result)
+        if 'since' in request.args:
+            return delta_response('education', scoped(), serialize_doc, repositories.education.sort)
+        education = repositories.education.all()
+        return jsonify([serialize_doc(edu) for edu in education])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -224,7 +309,9 @@ def get_education():
 @app.route('/api/certifications')
 def get_certifications():
     try:
-        certifications = list(mongo.db.certifications.find())
+        if 'since' in request.args:
+            return delta_response('certifications', scoped(), serialize_doc)
+        certifications = repositories.certifications.all()
         return jsonify([serialize_doc(cert) for cert in certifications])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -233,7 +320,9 @@ def get_certifications():
 @app.route('/api/achievements')
 def get_achievements():
     try:
-        achievements = list(mongo.db.achievements.find())
+        if 'since' in request.args:
+            return delta_response('achievements', scoped(), serialize_doc)
+        achievements = repositories.achievements.all()
         return jsonify([serialize_doc(a) for a in achievements])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -242,203 +331,132 @@ def get_achievements():
 @app.route('/api/technologies')
 def get_technologies():
     try:
-        technologies = list(mongo.db.technologies.find().sort('name', 1))
+        if 'since' in request.args:
+            return delta_response('technologies', scoped(), serialize_doc, repositories.technologies.sort)
+        technologies = repositories.technologies.all()
         return jsonify([serialize_doc(tech) for tech in technologies])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/technologies/<path:name>/usage')
+def get_technology_usage(name):
+    """Projects and roles that used a technology, from the precomputed index."""
+    try:
+        from technology_usage import get_technology_usage as find_usage
+        usage = find_usage(mongo.db, name)
+        if not usage:
+            return jsonify({"error": "Technology not found"}), 404
+        doc = serialize_doc(usage)
+        doc.pop('id', None)
+        return jsonify(doc)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/search')
+def search():
+    """Ranked, faceted search over projects, skills and experience."""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "Query parameter 'q' is required"}), 400
+
+        doc_type = request.args.get('type', '').strip().lower() or None
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+
+        from search import get_index
+        result = get_index().search(query, doc_type=doc_type, limit=limit)
+        result['query'] = query
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/api/contact', methods=['POST'])
+@contact_rate_limit
 def contact():
     try:
-        data = request.get_json()
-        name = data.get('name', '').strip()
-        email = data.get('email', '').strip()
-        subject = data.get('subject', '').strip()
-        message = data.get('message', '').strip()
-
-        if not all([name, email, subject, message]):
-            return jsonify({"error": "All fields are required"}), 400
-
-        # Basic email validation
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, email):
-            return jsonify({"error": "Please provide a valid email address"}), 400
-
-        # Save contact message to database
-        mongo.db.contacts.insert_one({
-            'name': name,
-            'email': email,
-            'subject': subject,
-            'message': message,
-            'is_read': False,
-            'is_replied': False,
-            'created_at': datetime.utcnow()
-        })
-
-        # Send email notification (if email is configured)
-        if app.config['MAIL_USERNAME'] and app.config['MAIL_PASSWORD']:
+        # Malformed or non-object bodies get the same 400 as on the ASGI app
+        data = request.get_json(silent=True)
+        contact_doc, error = parse_contact(data if isinstance(data, dict) else None)
+        if error:
+            return jsonify({"error": error}), 400
+        name = contact_doc['name']
+        email = contact_doc['email']
+        subject = contact_doc['subject']
+        message = contact_doc['message']
+
+        # Acknowledge resubmissions without storing or emailing them again
+        classify(contact_doc)
+        if is_duplicate(mongo.db, contact_doc['fingerprint']):
+            return jsonify(CONTACT_SUCCESS), 200
+        apply_retention(contact_doc)
+
+        # Save contact message to database; if that fails, let a retry through
+        try:
+            with versioned_write(mongo.db) as version:
+                contact_doc['version'] = version
+                repositories.contacts.insert(contact_doc)
+        except Exception:
+            release_fingerprint(mongo.db, contact_doc['fingerprint'])
+            raise
+        notifier.notify(current_tenant())
+
+        # Send email notification (if email is configured); spam is stored only
+        mail_configured = app.config['MAIL_USERNAME'] and app.config['MAIL_PASSWORD']
+        if mail_configured and not contact_doc['is_spam']:
             try:
-                html_body = f"""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <style>
-                        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                        .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-                        .content {{ background: #f8f9fa; padding: 30px; border: 1px solid #e9ecef; }}
-                        .field {{ margin-bottom: 20px; }}
-                        .label {{ font-weight: bold; color: #495057; margin-bottom: 5px; display: block; }}
-                        .value {{ background: white; padding: 10px; border-radius: 5px; border: 1px solid #dee2e6; }}
-                        .message-box {{ background: white; padding: 20px; border-radius: 5px; border: 1px solid #dee2e6; white-space: pre-wrap; }}
-                        .footer {{ background: #343a40; color: white; padding: 20px; text-align: center; border-radius: 0 0 10px 10px; }}
-                        .timestamp {{ color: #6c757d; font-size: 14px; }}
-                    </style>
-                </head>
-                <body>
-                    <div class="container">
-                        <div class="header">
-                            <h1>New Portfolio Contact!</h1>
-                            <p>Someone wants to connect with you</p>
-                        </div>
-                        <div class="content">
-                            <div class="field">
-                                <span class="label">Name:</span>
-                                <div class="value">{name}</div>
-                            </div>
-                            <div class="field">
-                                <span class="label">Email:</span>
-                                <div class="value">{email}</div>
-                            </div>
-                            <div class="field">
-                                <span class="label">Subject:</span>
-                                <div class="value">{subject}</div>
-                            </div>
-                            <div class="field">
-                                <span class="label">Message:</span>
-                                <div class="message-box">{message}</div>
-                            </div>
-                            <div class="field">
-                                <span class="label">Received:</span>
-                                <div class="timestamp">{datetime.now().strftime('%B %d, %Y at %I:%M %p')}</div>
-                            </div>
-                        </div>
-                        <div class="footer">
-                            <p>Reply directly to this email to respond to {name}</p>
-                            <p style="font-size: 12px; margin-top: 10px;">Sent from your portfolio website contact form</p>
-                        </div>
-                    </div>
-                </body>
-                </html>
-                """
-
-                text_body = f"""
-NEW PORTFOLIO CONTACT
-
-Name: {name}
-Email: {email}
-Subject: {subject}
-Received: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
-
-Message:
-{message}
-
----
-Reply directly to this email to respond to {name}.
-Sent from your portfolio website contact form.
-                """
-
-                msg = Message(
-                    subject=f"Portfolio Contact: {subject}",
+                # Imported here to keep the mail stack out of cold starts
+                from flask_mail import Message
+                from emails import confirmation_email, notification_email
+                from mailer import send_messages
+
+                notification = notification_email(name, email, subject, message)
+                messages = [Message(
                     sender=app.config['MAIL_USERNAME'],
                     recipients=[app.config['MAIL_USERNAME']],
                     reply_to=email,
-                    body=text_body,
-                    html=html_body
-                )
-                mail.send(msg)
+                    **notification
+                )]
 
                 # Send confirmation email to the sender
-                confirmation_html = f"""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <style>
-                        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                        .header {{ background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-                        .content {{ background: #f8f9fa; padding: 30px; border: 1px solid #e9ecef; }}
-                        .footer {{ background: #343a40; color: white; padding: 20px; text-align: center; border-radius: 0 0 10px 10px; }}
-                    </style>
-                </head>
-                <body>
-                    <div class="container">
-                        <div class="header">
-                            <h1>Message Received!</h1>
-                            <p>Thanks for reaching out</p>
-                        </div>
-                        <div class="content">
-                            <p>Hi {name}!</p>
-                            <p>Thank you for your message about "<strong>{subject}</strong>". I've received your inquiry and I'm excited to connect with you!</p>
-                            <p>I'll get back to you as soon as possible, usually within 24-48 hours.</p>
-                            <p>In the meantime, feel free to:</p>
-                            <ul>
-                                <li>Check out my latest projects on the website</li>
-                                <li>Connect with me on social media</li>
-                                <li>Explore my GitHub repositories</li>
-                            </ul>
-                            <p>Looking forward to our collaboration!</p>
-                            <p>Best regards,<br>Shoaib</p>
-                        </div>
-                        <div class="footer">
-                            <p>This is an automated confirmation. Please don't reply to this email.</p>
-                        </div>
-                    </div>
-                </body>
-                </html>
-                """
-
-                confirmation_msg = Message(
-                    subject="Thanks for reaching out! - Message Received",
-                    sender=app.config['MAIL_USERNAME'],
-                    recipients=[email],
-                    html=confirmation_html
-                )
-                mail.send(confirmation_msg)
+                if allow_confirmation(email):
+                    messages.append(Message(
+                        sender=app.config['MAIL_USERNAME'],
+                        recipients=[email],
+                        **confirmation_email(name, subject)
+                    ))
+
+                # The message is saved; don't keep SMTP going past the deadline
+                timeout = remaining_seconds(default=SMTP_TIMEOUT)
+                if timeout < MIN_SMTP_TIMEOUT:
+                    metrics.incr('emails_skipped_deadline')
+                else:
+                    send_messages(messages, timeout)
 
-            except Exception as email_error:
-                print(f"Failed to send email notification: {email_error}")
+            except Exception:
+                logger.exception("Failed to send email notification",
+                                 extra={'fields': {'request_id': g.get('request_id')}})
 
-        return jsonify({
-            "message": "Message sent successfully!",
-            "success": True,
-            "details": "I'll get back to you within 24-48 hours!"
-        }), 200
+        return jsonify(CONTACT_SUCCESS), 200
 
-    except Exception as e:
-        print(f"Contact form error: {e}")
+    except Exception:
+        logger.exception("Contact form error", extra={'fields': {'request_id': g.get('request_id')}})
         return jsonify({"error": "Failed to send message. Please try again."}), 500
 
 
 @app.route('/api/stats')
 def get_stats():
     try:
-        projects_count = mongo.db.projects.count_documents({})
-        developer = mongo.db.developer.find_one()
-        experience_years = developer.get('experience_years', 0) if developer else 0
-        technologies_count = len(mongo.db.skills.distinct('name'))
-
-        github_repos = mongo.db.site_settings.find_one({'key': 'github_repos_count'})
-        coffee_cups = mongo.db.site_settings.find_one({'key': 'coffee_cups_count'})
-
-        stats = {
-            "projects_completed": projects_count,
-            "years_experience": experience_years,
-            "technologies_used": technologies_count,
-            "github_repos": int(github_repos['value']) if github_repos else 25,
-            "coffee_cups": int(coffee_cups['value']) if coffee_cups else 1247
-        }
+        settings = repositories.site_settings.values(STATS_SETTINGS)
+        stats = build_stats(
+            repositories.projects.count(),
+            repositories.developer.get({'experience_years': 1}),
+            len(repositories.skills.distinct_names()),
+            settings.get('github_repos_count'),
+            settings.get('coffee_cups_count'),
+        )
         return jsonify(stats)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -446,24 +464,262 @@ def get_stats():
 
 @app.route('/api/admin/contacts')
 def get_contacts():
-    """Admin endpoint to view contact messages"""
+    """Admin endpoint to view contact messages, optionally filtered"""
     try:
-        contacts = list(mongo.db.contacts.find().sort('created_at', -1))
+        try:
+            query = contacts_query(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if 'since' in request.args:
+            # Tombstone anything past its retention before reporting changes
+            expire_contacts(mongo.db)
+            return delta_response('contacts', query, serialize_doc, repositories.contacts.sort)
+        contacts = repositories.contacts.list(query)
         return jsonify([serialize_doc(c) for c in contacts])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+EXPORT_FIELDS = [
+    'id', 'created_at', 'name', 'email', 'subject', 'message',
+    'is_read', 'is_replied', 'is_spam', 'spam_score'
+]
+EXPORT_BATCH_SIZE = 500
+# Bytes buffered before a chunk is sent to the client.
+EXPORT_CHUNK_SIZE = 64 * 1024
+# Leading characters that make a spreadsheet read a CSV cell as a formula.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_safe(row):
+    """Prefix visitor text like =HYPERLINK(...) with ' so spreadsheets show it as text."""
+    return {
+        key: "'" + value if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) else value
+        for key, value in row.items()
+    }
+
+
+def _export_rows(cursor, fmt):
+    """Encode contacts one at a time as CSV or NDJSON text."""
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for contact in cursor:
+            writer.writerow(_csv_safe(serialize_doc(contact)))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    else:
+        for contact in cursor:
+            yield json.dumps(serialize_doc(contact), default=str) + '\n'
+
+
+def _export_chunks(rows, compress):
+    """Group encoded rows into chunks, gzipping them on the fly if asked."""
+    gzipper = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending, size = [], 0
+    for row in rows:
+        data = row.encode('utf-8')
+        pending.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_SIZE:
+            chunk = b''.join(pending)
+            pending, size = [], 0
+            chunk = gzipper.compress(chunk) if gzipper else chunk
+            if chunk:
+                yield chunk
+    chunk = b''.join(pending)
+    if gzipper:
+        chunk = gzipper.compress(chunk) + gzipper.flush()
+    if chunk:
+        yield chunk
+
+
+@app.route('/api/admin/contacts/export')
+def export_contacts():
+    """Admin endpoint streaming contacts as CSV or NDJSON.
+
+    Accepts the same filters as /api/admin/contacts plus format=csv|ndjson
+    and gzip=true. Memory use stays flat regardless of collection size.
+    """
+    try:
+        fmt = request.args.get('format', 'ndjson').lower()
+        if fmt not in ('csv', 'ndjson'):
+            return jsonify({"error": "format must be 'csv' or 'ndjson'"}), 400
+        try:
+            query = contacts_query(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        compress = request.args.get('gzip', 'false').lower() == 'true'
+
+        cursor = repositories.contacts.cursor(query, EXPORT_BATCH_SIZE)
+        # A .gz file rather than Content-Encoding, which browsers would undo
+        if compress:
+            mimetype = 'application/gzip'
+        else:
+            mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        filename = f"contacts-{datetime.utcnow():%Y%m%d}.{fmt}" + ('.gz' if compress else '')
+
+        response = Response(
+            stream_with_context(_export_chunks(_export_rows(cursor, fmt), compress)),
+            mimetype=mimetype
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/admin/contacts/stream')
+def stream_contacts():
+    """Admin endpoint pushing contact changes as Server-Sent Events.
+
+    Resumes after the Last-Event-ID header (or ?since=) when given.
+    """
+    try:
+        try:
+            version = resume_version(request.headers.get('Last-Event-ID'), request.args.get('since'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not stream_slots.acquire(blocking=False):
+            metrics.incr('contact_streams_rejected')
+            response = jsonify({"error": STREAM_BUSY_ERROR})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(STREAM_BUSY_RETRY_AFTER)
+            return response
+        try:
+            tenant_id = current_tenant()
+            if version is None:
+                version = current_version(mongo.db, tenant_id)
+            response = Response(
+                stream_with_context(contact_events(mongo.db, tenant_id, version)),
+                mimetype='text/event-stream',
+                headers=STREAM_HEADERS
+            )
+        except Exception:
+            stream_slots.release()
+            raise
+        # Runs when the server closes the response, including on disconnect.
+        response.call_on_close(stream_slots.release)
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/admin/contacts/unread-count')
+def get_unread_count():
+    """Admin endpoint with the number of unread messages"""
+    try:
+        count = repositories.contacts.unread_count()
+        return jsonify({"unread": count})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# action -> [(extra filter, update)], each run as one update_many.
+BULK_UPDATES = {
+    # $min keeps an earlier expiry, such as spam's
+    'mark_read': lambda: [({}, {'$set': {'is_read': True}, '$min': {'expire_at': read_expiry()}})],
+    # Only the read expiry is cleared; spam keeps the one it was stored with
+    'mark_unread': lambda: [
+        ({'is_spam': {'$ne': True}}, {'$set': {'is_read': False}, '$unset': {'expire_at': ''}}),
+        ({'is_spam': True}, {'$set': {'is_read': False}}),
+    ],
+    'mark_replied': lambda: [({}, {'$set': {'is_replied': True}})],
+    'mark_unreplied': lambda: [({}, {'$set': {'is_replied': False}})],
+}
+
+
+@app.route('/api/admin/contacts/bulk', methods=['POST'])
+def bulk_update_contacts():
+    """Admin endpoint applying one action to many contacts.
+
+    Body: {"action": "mark_read" | "mark_unread" | "mark_replied" |
+    "mark_unreplied" | "delete", and either "ids": [...] or "filter": {...}}.
+    Runs as one update_many (two for mark_unread) or one tagged delete.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        action = data.get('action')
+        if action not in BULK_UPDATES and action != 'delete':
+            return jsonify({"error": f"Unknown action: {action!r}"}), 400
+
+        if 'ids' in data:
+            if not isinstance(data['ids'], list) or not data['ids']:
+                return jsonify({"error": "'ids' must be a non-empty list"}), 400
+            ids, invalid = parse_object_ids(data['ids'])
+            if invalid:
+                return jsonify({"error": "Invalid contact ids", "invalid_ids": invalid}), 400
+            query = scoped({'_id': {'$in': ids}})
+        elif isinstance(data.get('filter'), dict):
+            try:
+                query = contacts_query(data['filter'])
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        else:
+            return jsonify({"error": "Provide 'ids' or 'filter'"}), 400
+
+        if action == 'delete':
+            with versioned_write(mongo.db) as version:
+                ids, deleted = repositories.contacts.delete_many(query, version)
+                record_deletes(mongo.db, 'contacts', ids, version)
+            notifier.notify(current_tenant())
+            return jsonify({"action": action, "deleted": deleted})
+
+        matched = modified = 0
+        with versioned_write(mongo.db) as version:
+            for extra, update in BULK_UPDATES[action]():
+                update['$set']['version'] = version
+                result = repositories.contacts.update_many({'$and': [query, extra]} if extra else query, update)
+                matched += result.matched_count
+                modified += result.modified_count
+        if modified:
+            notifier.notify(current_tenant())
+        return jsonify({
+            "action": action,
+            "matched": matched,
+            "modified": modified
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/admin/metrics')
+def get_metrics():
+    """Admin endpoint with this worker's counters"""
+    return jsonify(metrics.snapshot())
+
+
+@app.route('/api/admin/analytics')
+def get_analytics():
+    """Admin endpoint with page or project view counts from hourly buckets"""
+    try:
+        kind = request.args.get('kind', 'page')
+        if kind not in ANALYTICS_KINDS:
+            return jsonify({"error": f"kind must be one of: {', '.join(ANALYTICS_KINDS)}"}), 400
+        try:
+            days = min(max(int(request.args.get('days', 7)), 1), MAX_ANALYTICS_DAYS)
+        except ValueError:
+            return jsonify({"error": "days must be an integer"}), 400
+        return jsonify(read_analytics(mongo.db, kind, days))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/api/admin/contacts/<contact_id>/read', methods=['PUT'])
 def mark_contact_read(contact_id):
     """Admin endpoint to mark contact as read"""
     try:
-        result = mongo.db.contacts.update_one(
-            {'_id': ObjectId(contact_id)},
-            {'$set': {'is_read': True}}
-        )
-        if result.matched_count == 0:
+        if not ObjectId.is_valid(contact_id):
+            return jsonify({"error": "Invalid contact id"}), 400
+        with versioned_write(mongo.db) as version:
+            found = repositories.contacts.mark_read(ObjectId(contact_id), read_expiry(), {'version': version})
+        if not found:
             return jsonify({"error": "Contact not found"}), 404
+        notifier.notify(current_tenant())
         return jsonify({"message": "Contact marked as read"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -472,24 +728,38 @@ def mark_contact_read(contact_id):
 # Serve static files
 @app.route('/static/<path:filename>')
 def static_files(filename):
-    return send_from_directory('static', filename)
+    return serve_static(filename)
 
 
 # Database initialization
 def init_app():
-    """Initialize the application with seed data if empty."""
+    """Migrate older data in place and, for a single portfolio, seed it if empty."""
     with app.app_context():
-        if not mongo.db.developer.find_one():
+        if mongo.db.developer.find_one({'tenant_id': {'$exists': False}}, {'_id': 1}):
+            from init_db import upgrade_to_tenants
+            upgrade_to_tenants(mongo.db)
+        if any(mongo.db[name].find_one({'technologies_lc': {'$exists': False}}, {'_id': 1})
+               for name in ('projects', 'experience')):
+            from init_db import add_technology_keys
+            add_technology_keys(mongo.db)
+        if TENANCY_MODE == 'single' and not mongo.db.developer.find_one(scoped(tenant_id=DEFAULT_TENANT)):
             from init_db import init_database
             init_database()
 
 
-# Initialize the database when the app starts (for production)
-init_app()
+def startup():
+    """Seed the database if needed and start the keep-alive thread."""
+    init_app()
+
+    # Start keep-alive thread in production
+    if os.environ.get('FLASK_ENV') == 'production':
+        keep_alive()
+
 
-# Start keep-alive thread in production
-if os.environ.get('FLASK_ENV') == 'production':
-    keep_alive()
+# gunicorn.conf.py sets DEFER_STARTUP and calls startup() itself once the
+# master is ready, so importing the app for preload stays cheap.
+if os.environ.get('DEFER_STARTUP') != '1':
+    startup()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5001))
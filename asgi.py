@@ -0,0 +1,623 @@
+"""
+Async (ASGI) entry point.
+
+Serves the same URL map as the Flask app in app.py, but the public read
+routes and the contact form run as coroutines on Motor (async MongoDB)
+and aiosmtplib, so one process can hold hundreds of requests that are
+waiting on Atlas or SMTP; so does the admin contact stream. Every other
+route (admin, search, static) is delegated to the Flask app through a
+WSGI adapter, on a pool of WSGI_THREADS threads so one slow export or
+profile doesn't hold up the rest. Admission pools and the stream cap
+apply on both paths.
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT --no-access-log
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from bson.objectid import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+from werkzeug.datastructures import Headers, MultiDict
+from werkzeug.exceptions import HTTPException
+
+from app import (
+    app as flask_app, CONTACT_SUCCESS, MIN_SMTP_TIMEOUT, STATS_SETTINGS, build_stats, order_projects,
+    parse_contact, split_ids, validate_project_ids,
+)
+import metrics
+import repositories
+from repositories import run_async
+from admission import (
+    ADMISSION_RETRY_AFTER, ADMISSION_WAIT_MS, BUSY_ERROR, REQUEST_DEADLINE_MS, count_rejection, pool_for,
+)
+from analytics import counters as analytics_counters, record_request
+from contact_stream import (
+    HEARTBEAT_FRAME, RETRY_FRAME, STATE_PROJECTION, STREAM_BUSY_ERROR, STREAM_BUSY_RETRY_AFTER, STREAM_HEADERS,
+    STREAM_HEARTBEAT_SECONDS, STREAM_MAX_SECONDS, STREAM_POLL_SECONDS, change_queries, format_event, group_changes,
+    needs_resync, notifier, resume_version, stream_slots,
+)
+from cors import ALLOW_ANY_ORIGIN, allowed_origin, is_preflight, preflight_headers
+from compression import COMPRESS_MIN_SIZE, encode_body, negotiate_encoding
+from models import format_experience, format_project, mongo, serialize_doc
+from rate_limit import allow_confirmation, check_contact_limits, client_ip
+from request_log import ensure_listener, log_access, logger, new_request_id, reset_request, track_request
+from retention import apply_retention, expire_contacts
+from skills_view import cached_view as cached_skills_view, get_view as get_skills_view
+from tenancy import reset_tenant, resolve, use_tenant
+from versioning import (
+    TOMBSTONES_COLLECTION, VERSIONS_COLLECTION, committed_version, dead_writes_cleanup, has_dead_writes,
+    version_claim, version_release,
+)
+from spam import (
+    FINGERPRINT_COLLECTION, classify, fingerprint_document, recent_fingerprints,
+)
+
+# Threads serving requests delegated to the Flask app.
+WSGI_THREADS = int(os.environ.get('WSGI_THREADS', 8))
+
+_wsgi_executor = ThreadPoolExecutor(WSGI_THREADS, thread_name_prefix='wsgi')
+
+
+class PooledWsgiToAsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs this thread-sensitively: every request on one shared thread.
+    run_wsgi_app = sync_to_async(
+        vars(WsgiToAsgiInstance)['run_wsgi_app'].func, thread_sensitive=False, executor=_wsgi_executor
+    )
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi that serves requests concurrently on ``_wsgi_executor``."""
+
+    async def __call__(self, scope, receive, send):
+        await PooledWsgiToAsgiInstance(self.wsgi_application)(scope, receive, send)
+
+
+wsgi_app = PooledWsgiToAsgi(flask_app)
+
+_client = None
+
+
+def get_db():
+    """Motor database, created on first use inside the running event loop."""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(flask_app.config['MONGO_URI'])
+    return _client.get_default_database('portfolio')
+
+
+# ---------- Async handlers, keyed by Flask endpoint name ----------
+#
+# Each returns (status, payload) or (status, payload, extra headers).
+
+async def home(db, args, **kwargs):
+    return 200, {
+        "message": "Portfolio Backend API",
+        "version": "3.0.0",
+        "database": "MongoDB",
+        "status": "running"
+    }
+
+
+async def get_developer_info(db, args, **kwargs):
+    developer = await run_async(repositories.developer.get_read(), db)
+    if not developer:
+        return 404, {"error": "Developer information not found"}
+    return 200, serialize_doc(developer)
+
+
+# Skills come from the in-memory view shared with the Flask app; it is
+# rebuilt at most once per SKILLS_VIEW_TTL.
+
+async def skills_view():
+    # The rebuild queries MongoDB with the blocking client under a lock, so
+    # it runs in a worker thread rather than on the event loop.
+    return cached_skills_view() or await asyncio.to_thread(get_skills_view)
+
+
+async def get_skills(db, args, **kwargs):
+    featured_only = args.get('featured', 'false').lower() == 'true'
+    return 200, (await skills_view()).select(featured_only, args.get('category', ''))
+
+
+async def get_skill_categories(db, args, **kwargs):
+    return 200, (await skills_view()).categories
+
+
+async def get_projects(db, args, **kwargs):
+    if 'ids' in args:
+        ids, error = validate_project_ids(split_ids(args['ids']))
+        if error:
+            return 400, error
+        return 200, order_projects(ids, await run_async(repositories.projects.by_ids_read(ids), db))
+    projects = await run_async(repositories.projects.list_read(args), db)
+    return 200, [format_project(project) for project in projects]
+
+
+async def get_project(db, args, project_id, **kwargs):
+    if not ObjectId.is_valid(project_id):
+        return 400, {"error": "Invalid project id"}
+    project = await run_async(repositories.projects.get_read(ObjectId(project_id)), db)
+    if not project:
+        return 404, {"error": "Project not found"}
+    return 200, format_project(project)
+
+
+async def get_experience(db, args, **kwargs):
+    experiences = await run_async(repositories.experience.list_read(args), db)
+    return 200, [format_experience(exp) for exp in experiences]
+
+
+async def get_education(db, args, **kwargs):
+    education = await run_async(repositories.education.all_read(), db)
+    return 200, [serialize_doc(edu) for edu in education]
+
+
+async def get_certifications(db, args, **kwargs):
+    certifications = await run_async(repositories.certifications.all_read(), db)
+    return 200, [serialize_doc(cert) for cert in certifications]
+
+
+async def get_achievements(db, args, **kwargs):
+    achievements = await run_async(repositories.achievements.all_read(), db)
+    return 200, [serialize_doc(a) for a in achievements]
+
+
+async def get_technologies(db, args, **kwargs):
+    technologies = await run_async(repositories.technologies.all_read(), db)
+    return 200, [serialize_doc(tech) for tech in technologies]
+
+
+async def get_stats(db, args, **kwargs):
+    # The four lookups are independent, so issue them concurrently.
+    projects_count, developer, names, settings = await asyncio.gather(
+        run_async(repositories.projects.count_read(), db),
+        run_async(repositories.developer.get_read({'experience_years': 1}), db),
+        run_async(repositories.skills.distinct_names_read(), db),
+        run_async(repositories.site_settings.values_read(STATS_SETTINGS), db),
+    )
+    settings = repositories.site_settings.by_key(settings)
+    return 200, build_stats(projects_count, developer, len(names),
+                            settings.get('github_repos_count'), settings.get('coffee_cups_count'))
+
+
+async def send_contact_emails(contact_doc, send_confirmation, timeout):
+    # Imported here to keep the mail stack out of cold starts
+    from email.message import EmailMessage
+
+    import aiosmtplib
+    from emails import confirmation_email, notification_email
+
+    config = flask_app.config
+    notification = notification_email(
+        contact_doc['name'], contact_doc['email'], contact_doc['subject'], contact_doc['message']
+    )
+    confirmation = confirmation_email(contact_doc['name'], contact_doc['subject'])
+
+    messages = []
+    msg = EmailMessage()
+    msg['Subject'] = notification['subject']
+    msg['From'] = config['MAIL_USERNAME']
+    msg['To'] = config['MAIL_USERNAME']
+    msg['Reply-To'] = contact_doc['email']
+    msg.set_content(notification['body'])
+    msg.add_alternative(notification['html'], subtype='html')
+    messages.append(msg)
+
+    if send_confirmation:
+        msg = EmailMessage()
+        msg['Subject'] = confirmation['subject']
+        msg['From'] = config['MAIL_USERNAME']
+        msg['To'] = contact_doc['email']
+        msg.set_content(confirmation['html'], subtype='html')
+        messages.append(msg)
+
+    smtp = aiosmtplib.SMTP(
+        hostname=config['MAIL_SERVER'], port=config['MAIL_PORT'],
+        start_tls=config['MAIL_USE_TLS'], timeout=timeout,
+    )
+    async with smtp:
+        await smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        for msg in messages:
+            await smtp.send_message(msg)
+
+
+async def is_duplicate(db, fp):
+    """Async counterpart of spam.is_duplicate()."""
+    if recent_fingerprints.seen(fp):
+        metrics.incr('contact_duplicates')
+        return True
+    try:
+        await db[FINGERPRINT_COLLECTION].insert_one(fingerprint_document(fp))
+    except DuplicateKeyError:
+        metrics.incr('contact_duplicates')
+        return True
+    return False
+
+
+async def release_fingerprint(db, fp):
+    """Async counterpart of spam.release_fingerprint()."""
+    recent_fingerprints.forget(fp)
+    await db[FINGERPRINT_COLLECTION].delete_one({'_id': fp})
+
+
+async def begin_write(db, tenant_id):
+    """Async counterpart of versioning.begin_write()."""
+    while True:
+        state = await db[VERSIONS_COLLECTION].find_one({'_id': tenant_id}, {'version': 1})
+        query, update, version = version_claim(state, tenant_id)
+        try:
+            await db[VERSIONS_COLLECTION].update_one(query, update, upsert=True)
+            return version
+        except DuplicateKeyError:
+            continue
+
+
+async def end_write(db, version, tenant_id):
+    query, update = version_release(version, tenant_id)
+    state = await db[VERSIONS_COLLECTION].find_one_and_update(query, update, {'pending': 1})
+    if has_dead_writes(state):
+        await db[VERSIONS_COLLECTION].update_one(*dead_writes_cleanup(tenant_id))
+
+
+async def store_contact(db, contact_doc):
+    """Insert a classified contact; False if it duplicates a recent one."""
+    if await is_duplicate(db, contact_doc['fingerprint']):
+        return False
+    apply_retention(contact_doc)
+
+    tenant_id = contact_doc['tenant_id']
+    try:
+        contact_doc['version'] = await begin_write(db, tenant_id)
+        try:
+            await db.contacts.insert_one(contact_doc)
+        finally:
+            await end_write(db, contact_doc['version'], tenant_id)
+    except BaseException:
+        # Nothing was stored (or the deadline cancelled us); let a retry through
+        await release_fingerprint(db, contact_doc['fingerprint'])
+        raise
+    notifier.notify(tenant_id)
+    return True
+
+
+async def contact(db, args, body=b'', headers=None, client=None, deadline=None, **kwargs):
+    # With RATE_LIMIT_BACKEND=mongo the limiters block on PyMongo, so they run in a thread.
+    retry_after = await asyncio.to_thread(check_contact_limits, client_ip(headers, client))
+    if retry_after:
+        return 429, {"error": "Too many requests. Please try again later."}, {
+            'Retry-After': str(math.ceil(retry_after))
+        }
+    try:
+        data = json.loads(body or b'null')
+    except ValueError:
+        data = None
+    loop = asyncio.get_running_loop()
+    try:
+        contact_doc, error = parse_contact(data if isinstance(data, dict) else None)
+        if error:
+            return 400, {"error": error}
+
+        # Acknowledge resubmissions without storing or emailing them again
+        classify(contact_doc)
+        try:
+            stored = await asyncio.wait_for(store_contact(db, contact_doc), deadline - loop.time())
+        except asyncio.TimeoutError:
+            metrics.incr('deadline_exceeded')
+            return 503, {"error": DEADLINE_ERROR}
+        if not stored:
+            return 200, CONTACT_SUCCESS
+
+        # The message is saved, so the visitor gets a success whatever SMTP
+        # does; it only has what is left of the deadline.
+        mail_configured = flask_app.config['MAIL_USERNAME'] and flask_app.config['MAIL_PASSWORD']
+        if mail_configured and not contact_doc['is_spam']:
+            try:
+                send_confirmation = await asyncio.to_thread(allow_confirmation, contact_doc['email'])
+                timeout = deadline - loop.time()
+                if timeout < MIN_SMTP_TIMEOUT:
+                    metrics.incr('emails_skipped_deadline')
+                else:
+                    await asyncio.wait_for(send_contact_emails(contact_doc, send_confirmation, timeout), timeout)
+            except Exception:
+                logger.exception("Failed to send email notification")
+
+        return 200, CONTACT_SUCCESS
+    except Exception:
+        logger.exception("Contact form error")
+        return 500, {"error": "Failed to send message. Please try again."}
+
+
+HANDLERS = {
+    'home': home,
+    'get_developer_info': get_developer_info,
+    'get_skills': get_skills,
+    'get_skill_categories': get_skill_categories,
+    'get_projects': get_projects,
+    'get_project': get_project,
+    'get_experience': get_experience,
+    'get_experiences': get_experience,
+    'get_education': get_education,
+    'get_certifications': get_certifications,
+    'get_achievements': get_achievements,
+    'get_technologies': get_technologies,
+    'get_stats': get_stats,
+    'contact': contact,
+}
+
+# Handlers that apply the deadline themselves, so a contact that was
+# saved is never answered with a timeout.
+OWN_DEADLINE = {'contact'}
+
+DEADLINE_ERROR = "Request timed out. Please try again."
+
+
+# ---------- Contact stream ----------
+#
+# Served here rather than through the WSGI adapter, where a stream would
+# hold one of its WSGI_THREADS threads for as long as it is open.
+
+STREAM_PATH = '/api/admin/contacts/stream'
+
+
+async def _watch_disconnect(receive, disconnected):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    disconnected.set()
+
+
+async def read_state(db, tenant_id):
+    return await db[VERSIONS_COLLECTION].find_one({'_id': tenant_id}, STATE_PROJECTION)
+
+
+async def contact_stream(db, tenant_id, version, headers, receive, send):
+    if version is None:
+        version = committed_version(await read_state(db, tenant_id))
+    response_headers = [(b'content-type', b'text/event-stream; charset=utf-8')]
+    response_headers += _cors_headers(headers.get('origin'))
+    response_headers += [(k.lower().encode(), v.encode()) for k, v in STREAM_HEADERS.items()]
+    await send({'type': 'http.response.start', 'status': 200, 'headers': response_headers})
+
+    async def emit(frame):
+        await send({'type': 'http.response.body', 'body': frame.encode('utf-8'), 'more_body': True})
+
+    disconnected = asyncio.Event()
+    watcher = asyncio.create_task(_watch_disconnect(receive, disconnected))
+    loop = asyncio.get_running_loop()
+    try:
+        started = last_sent = loop.time()
+        await emit(RETRY_FRAME)
+        while not disconnected.is_set() and loop.time() - started < STREAM_MAX_SECONDS:
+            seen = notifier.current(tenant_id)
+            # The sweep is rare and small; run it on the blocking client.
+            await asyncio.to_thread(expire_contacts, mongo.db, tenant_id)
+            state = await read_state(db, tenant_id)
+            watermark = committed_version(state)
+            if needs_resync(version, state):
+                await emit(format_event({'version': watermark}, event='resync', event_id=watermark))
+                last_sent = loop.time()
+                version = watermark
+            elif watermark > version:
+                contacts_query, tombstones_query = change_queries(tenant_id, version, watermark)
+                contacts, tombstones = await asyncio.gather(
+                    db.contacts.find(contacts_query).to_list(None),
+                    db[TOMBSTONES_COLLECTION].find(tombstones_query, {'doc_id': 1, 'version': 1}).to_list(None),
+                )
+                for event_version, change in group_changes(contacts, tombstones):
+                    await emit(format_event(change, event='contacts', event_id=event_version))
+                    last_sent = loop.time()
+                version = watermark
+            if loop.time() - last_sent >= STREAM_HEARTBEAT_SECONDS:
+                await emit(HEARTBEAT_FRAME)
+                last_sent = loop.time()
+            await notifier.wait_async(tenant_id, seen, min(STREAM_POLL_SECONDS, STREAM_HEARTBEAT_SECONDS))
+        if not disconnected.is_set():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        watcher.cancel()
+
+
+# ---------- ASGI plumbing ----------
+
+def _match(scope, path):
+    """Flask endpoint and view args for this request, or None to delegate."""
+    if scope['method'] == 'OPTIONS':
+        return None
+    adapter = flask_app.url_map.bind('localhost')
+    try:
+        rule, view_args = adapter.match(path, method=scope['method'], return_rule=True)
+    except HTTPException:
+        return None
+    if rule.endpoint not in HANDLERS:
+        return None
+    return rule.endpoint, view_args, rule.rule
+
+
+async def _read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+def _cors_headers(origin):
+    response_headers = [] if ALLOW_ANY_ORIGIN else [(b'vary', b'Origin')]
+    allow_origin = allowed_origin(origin)
+    if allow_origin:
+        response_headers.append((b'access-control-allow-origin', allow_origin.encode('latin-1')))
+    return response_headers
+
+
+async def admit(pool):
+    """Async counterpart of admission's before_request check; True once a slot is held."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    if not pool.acquire(0):
+        # Wait for a slot in a worker thread so the event loop keeps running.
+        waiter = asyncio.ensure_future(asyncio.to_thread(pool.acquire, ADMISSION_WAIT_MS / 1000))
+        try:
+            admitted = await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # Give back a slot that arrives after the request is gone.
+            waiter.add_done_callback(lambda f: f.result() and pool.release())
+            raise
+        if not admitted:
+            count_rejection(pool)
+            return False
+    metrics.incr('admission_wait_ms', int((loop.time() - started) * 1000))
+    return True
+
+
+async def _send_json(send, status, payload, headers, method, extra_headers=None):
+    body, response_headers = _encode(status, payload, headers, method)
+    response_headers += [(k.lower().encode(), v.encode()) for k, v in (extra_headers or {}).items()]
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': body if method != 'HEAD' else b''})
+
+
+def _encode(status, payload, headers, method):
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8') + b'\n'
+    response_headers = [
+        (b'content-type', b'application/json'),
+        (b'vary', b'Accept-Encoding'),
+    ] + _cors_headers(headers.get('origin'))
+    if status == 200 and len(body) >= COMPRESS_MIN_SIZE:
+        encoding = negotiate_encoding(headers.get('accept-encoding', ''))
+        if encoding:
+            body = encode_body(body, encoding, method in ('GET', 'HEAD'))
+            response_headers.append((b'content-encoding', encoding.encode()))
+    response_headers.append((b'content-length', str(len(body)).encode()))
+    return body, response_headers
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            ensure_listener()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await asyncio.to_thread(analytics_counters.flush)
+            if _client is not None:
+                _client.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def _logged(serve, method, route, path, tenant_id, headers, send):
+    """Run ``serve(send)`` with the Flask app's access log line and X-Request-ID."""
+    request_id = new_request_id(headers.get('x-request-id'))
+    started = time.perf_counter()
+    stats_token = track_request()
+    logged = False
+
+    async def send_logged(message):
+        nonlocal logged
+        if message['type'] == 'http.response.start':
+            message = dict(message, headers=[*message['headers'], (b'x-request-id', request_id.encode('latin-1'))])
+            # Logged when headers go out, as Flask's after_request does
+            log_access(request_id, tenant_id, method, route, path, message['status'],
+                       (time.perf_counter() - started) * 1000)
+            logged = True
+        await send(message)
+
+    try:
+        await serve(send_logged)
+    finally:
+        if not logged:
+            log_access(request_id, tenant_id, method, route, path, 500, (time.perf_counter() - started) * 1000)
+        reset_request(stats_token)
+
+
+async def _serve_stream(send, tenant_id, headers, args, receive):
+    try:
+        version = resume_version(headers.get('last-event-id'), args.get('since'))
+    except ValueError as e:
+        return await _send_json(send, 400, {"error": str(e)}, headers, 'GET')
+    if not stream_slots.acquire(blocking=False):
+        metrics.incr('contact_streams_rejected')
+        return await _send_json(send, 503, {"error": STREAM_BUSY_ERROR}, headers, 'GET',
+                                {'Retry-After': str(STREAM_BUSY_RETRY_AFTER)})
+    try:
+        return await contact_stream(get_db(), tenant_id, version, headers, receive, send)
+    finally:
+        stream_slots.release()
+
+
+async def _serve_handler(send, scope, tenant_id, headers, args, receive, endpoint, view_args, rule):
+    # Same per-process pools as the Flask app, which delegated routes go through.
+    pool = pool_for(endpoint)
+    if pool is not None and not await admit(pool):
+        return await _send_json(send, 503, {"error": BUSY_ERROR}, headers, scope['method'],
+                                {'Retry-After': str(ADMISSION_RETRY_AFTER)})
+
+    extra_headers = {}
+    token = use_tenant(tenant_id)
+    try:
+        body = await _read_body(receive) if scope['method'] == 'POST' else b''
+        client = scope['client'][0] if scope.get('client') else None
+        deadline = asyncio.get_running_loop().time() + REQUEST_DEADLINE_MS / 1000
+        handler = HANDLERS[endpoint](
+            get_db(), args, body=body, headers=headers, client=client, deadline=deadline, **view_args
+        )
+        if endpoint not in OWN_DEADLINE:
+            # Cancelling the handler at the deadline abandons its Motor calls.
+            handler = asyncio.wait_for(handler, REQUEST_DEADLINE_MS / 1000)
+        result = await handler
+        status, payload = result[:2]
+        if len(result) > 2:
+            extra_headers = result[2]
+    except asyncio.TimeoutError:
+        metrics.incr('deadline_exceeded')
+        status, payload = 503, {"error": DEADLINE_ERROR}
+    except Exception as e:
+        status, payload = 500, {"error": str(e)}
+    finally:
+        reset_tenant(token)
+        if pool is not None:
+            pool.release()
+    if scope['method'] == 'GET':
+        record_request(rule, view_args, status, tenant_id)
+
+    await _send_json(send, status, payload, headers, scope['method'], extra_headers)
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    headers = Headers([(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope['headers']])
+    if is_preflight(scope['method'], headers.get('origin'), headers.get('access-control-request-method')):
+        preflight = [(k.lower().encode(), v.encode('latin-1')) for k, v in preflight_headers(headers.get('origin'))]
+        await send({'type': 'http.response.start', 'status': 204, 'headers': preflight})
+        return await send({'type': 'http.response.body', 'body': b''})
+    # Tenant lookups are cached; a miss is one small find_one.
+    tenant_id, path = resolve(headers.get('host', ''), scope['path'])
+    args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+    if tenant_id is not None and path == STREAM_PATH and scope['method'] == 'GET':
+        return await _logged(
+            lambda send: _serve_stream(send, tenant_id, headers, args, receive),
+            'GET', STREAM_PATH, path, tenant_id, headers, send
+        )
+    matched = _match(scope, path) if tenant_id is not None else None
+    if matched is None or 'since' in args:
+        # The Flask app resolves the tenant again (and 404s unknown ones)
+        # and serves the ?since= delta responses.
+        return await wsgi_app(scope, receive, send)
+    endpoint, view_args, rule = matched
+    await _logged(
+        lambda send: _serve_handler(send, scope, tenant_id, headers, args, receive, endpoint, view_args, rule),
+        scope['method'], rule, path, tenant_id, headers, send
+    )
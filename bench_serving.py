@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Serving Mode Load Comparison
+Fires concurrent requests at one or more running API servers and prints
+throughput and latency percentiles, e.g. sync gunicorn vs. the ASGI app:
+
+    gunicorn --bind 0.0.0.0:5001 app:app
+    uvicorn asgi:app --port 5002
+    python bench_serving.py http://localhost:5001 http://localhost:5002
+
+Options: -c concurrency levels (default 1,10,50,200), -n requests per
+level (default 500), -p paths (default: the public read endpoints).
+"""
+
+import argparse
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PATHS = [
+    '/api/developer',
+    '/api/projects',
+    '/api/skills',
+    '/api/experience',
+    '/api/stats',
+]
+
+
+def fetch(url):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            ok = response.status == 200
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_level(base_url, paths, concurrency, total):
+    urls = [base_url.rstrip('/') + paths[i % len(paths)] for i in range(total)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency * 1000 for latency, ok in results if ok]
+    errors = sum(1 for _, ok in results if not ok)
+    return {
+        'rps': total / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('targets', nargs='+', help='Base URLs of running servers')
+    parser.add_argument('-c', '--concurrency', default='1,10,50,200')
+    parser.add_argument('-n', '--requests', type=int, default=500)
+    parser.add_argument('-p', '--paths', default=','.join(DEFAULT_PATHS))
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(',')]
+    paths = args.paths.split(',')
+
+    print(f"{'target':<32} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for target in args.targets:
+        fetch(target.rstrip('/') + paths[0])  # warm up
+        for concurrency in levels:
+            r = run_level(target, paths, concurrency, args.requests)
+            print(f"{target:<32} {concurrency:>5} {r['rps']:>9.1f} {r['p50']:>8.1f} "
+                  f"{r['p95']:>8.1f} {r['p99']:>8.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Query Budget Check
+Seeds an in-memory MongoDB (mongomock) from seed_data.json, requests each
+endpoint once with the in-process caches cleared, and exits non-zero if
+an endpoint made more repository round trips or read more documents than
+its budget:
+
+    pip install mongomock
+    python check_query_budgets.py
+
+asgi.py serves these routes with the same repository Read specs on
+Motor, so the budgets hold for it too. Run this before merging anything
+that touches a route or repositories.py.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+os.environ.setdefault('DEFER_STARTUP', '1')
+os.environ.setdefault('ANALYTICS_DISABLED', '1')
+
+# path: (round trips, documents). Documents are a number, a collection
+# name (every seeded document in it), or a list of those to add up.
+BUDGETS = {
+    '/api/developer': (1, 1),
+    '/api/skills': (1, 'skills'),
+    '/api/skills/categories': (1, 'skills'),
+    '/api/projects': (1, 'projects'),
+    '/api/projects?featured=true': (1, 'projects'),
+    '/api/projects?ids={project_id}': (1, 1),
+    '/api/projects/{project_id}': (1, 1),
+    '/api/experience': (1, 'experience'),
+    '/api/education': (1, 'education'),
+    '/api/certifications': (1, 'certifications'),
+    '/api/achievements': (1, 'achievements'),
+    '/api/technologies': (1, 'technologies'),
+    '/api/stats': (4, [1, 'skills', 2]),
+    '/api/search?q=python': (3, ['projects', 'skills', 'experience']),
+    '/api/admin/contacts': (1, 'contacts'),
+    '/api/admin/contacts/unread-count': (1, 0),
+}
+
+SAMPLE_CONTACTS = 3
+
+
+def document_budget(spec, counts):
+    if isinstance(spec, list):
+        return sum(document_budget(part, counts) for part in spec)
+    if isinstance(spec, str):
+        return counts[spec]
+    return spec
+
+
+def clear_caches():
+    import search
+    import skills_view
+    from response_cache import response_cache
+
+    search.invalidate()
+    skills_view.invalidate()
+    response_cache.clear()
+
+
+def main():
+    try:
+        import mongomock
+    except ImportError:
+        print("mongomock is required: pip install mongomock")
+        return 2
+
+    from app import app
+    from init_db import load_seed_data, seed_database
+    from models import mongo
+    from repositories import track_queries
+    from tenancy import DEFAULT_TENANT
+
+    db = mongomock.MongoClient().db
+    mongo.db = db
+    counts = seed_database(db, load_seed_data())
+    db.contacts.insert_many([
+        {'tenant_id': DEFAULT_TENANT, 'name': f'Sender {i}', 'email': f'sender{i}@example.com',
+         'subject': 'Hello', 'message': 'Budget check', 'is_read': False, 'is_replied': False,
+         'created_at': datetime.utcnow(), 'version': 1}
+        for i in range(SAMPLE_CONTACTS)
+    ])
+    counts['contacts'] = SAMPLE_CONTACTS
+    project_id = str(db.projects.find_one({}, {'_id': 1})['_id'])
+
+    client = app.test_client()
+    failures = 0
+    print(f"{'Endpoint':<44} {'Trips':>11} {'Documents':>11}")
+    print("-" * 68)
+    for path, (max_trips, documents) in BUDGETS.items():
+        path = path.format(project_id=project_id)
+        max_documents = document_budget(documents, counts)
+        clear_caches()
+        with track_queries() as stats:
+            response = client.get(path)
+        over = stats.round_trips > max_trips or stats.documents > max_documents
+        if response.status_code != 200 or over:
+            failures += 1
+        status = "" if response.status_code == 200 else f"  HTTP {response.status_code}"
+        print(f"{path:<44} {stats.round_trips:>5} / {max_trips:<3} "
+              f"{stats.documents:>5} / {max_documents:<3}{'  OVER BUDGET' if over else ''}{status}")
+        if over:
+            print(f"    calls: {', '.join(stats.calls)}")
+
+    print()
+    print(f"{len(BUDGETS) - failures}/{len(BUDGETS)} endpoints within budget")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import request
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed.
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+# Number of compressed bodies kept in memory.
+COMPRESS_CACHE_SIZE = int(os.environ.get('COMPRESS_CACHE_SIZE', 256))
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'image/svg+xml',
+    'text/css',
+    'text/csv',
+    'text/html',
+    'text/plain',
+}
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=9)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by content digest and encoding.
+
+    Identical bodies (the common case for the public GET endpoints) are
+    compressed once per encoding and reused for every later response.
+    """
+
+    def __init__(self, max_entries=COMPRESS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, body, encoding):
+        key = (hashlib.sha1(body).digest(), encoding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+        compressed = _compress(body, encoding)
+        with self._lock:
+            self._entries[key] = compressed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+
+compressed_bodies = CompressedBodyCache()
+
+
+def supported_encodings():
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+
+def negotiate_encoding(accept_encoding=None):
+    """Pick the best encoding the client accepts, or None.
+
+    Reads the current Flask request unless a header value is given.
+    """
+    if accept_encoding is None:
+        accept_encodings = request.accept_encodings
+    else:
+        accept_encodings = parse_accept_header(accept_encoding)
+    return accept_encodings.best_match(supported_encodings())
+
+
+def encode_body(body, encoding, cacheable=True):
+    """Compressed ``body``, reusing the cached copy for cacheable responses."""
+    if cacheable:
+        return compressed_bodies.get(body, encoding)
+    return _compress(body, encoding)
+
+
+def compress_response(response):
+    """after_request hook: gzip/brotli-encode eligible responses."""
+    response.vary.add('Accept-Encoding')
+
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    encoding = negotiate_encoding()
+    if not encoding:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(encode_body(body, encoding, request.method in ('GET', 'HEAD')))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
@@ -0,0 +1,189 @@
+"""
+Server-Sent Events for contact changes.
+
+A stream sends one ``contacts`` event per content version, listing the
+contacts written and the ids deleted at that version. The event id is the
+version, so an EventSource that reconnects with Last-Event-ID picks up
+where it stopped; ``?since=<version>`` does the same for the first
+connection. Without either, the stream starts at the current version.
+Like delta sync, a stream only moves up to the committed watermark, so a
+write that finishes after a later one is still sent. When the stream is
+behind the floor (a reseed, or expired contacts that weren't tombstoned)
+it sends a ``resync`` event instead, and the client reloads the list.
+
+Writes in this process wake streams at once through ``notifier``; writes
+made by other workers are picked up by an indexed poll every
+STREAM_POLL_SECONDS. Under gunicorn each open stream holds a worker
+thread, so streams per process are capped at MAX_CONTACT_STREAMS and
+every stream ends after STREAM_MAX_SECONDS (the browser reconnects on
+its own).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from models import serialize_doc
+from retention import expire_contacts
+from tenancy import scoped
+from versioning import TOMBSTONES_COLLECTION, VERSIONS_COLLECTION, committed_version, parse_since
+
+# Seconds of silence before a comment frame keeps proxies from closing the stream.
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get('STREAM_HEARTBEAT_SECONDS', 15))
+# Seconds between checks for writes made by other workers.
+STREAM_POLL_SECONDS = float(os.environ.get('STREAM_POLL_SECONDS', 5))
+# Seconds a stream stays open before the client is asked to reconnect.
+STREAM_MAX_SECONDS = float(os.environ.get('STREAM_MAX_SECONDS', 300))
+# Open streams per process; each holds a gunicorn thread.
+MAX_CONTACT_STREAMS = int(os.environ.get('MAX_CONTACT_STREAMS', 2))
+# Milliseconds the browser waits before reconnecting.
+STREAM_RETRY_MS = 3000
+# Seconds clients are told to wait when every stream slot is taken.
+STREAM_BUSY_RETRY_AFTER = 30
+STREAM_BUSY_ERROR = "Too many open streams. Please try again later."
+
+STREAM_HEADERS = {
+    'Cache-Control': 'no-cache',
+    # Stop nginx from buffering the stream.
+    'X-Accel-Buffering': 'no',
+}
+
+
+class ChangeNotifier:
+    """Per-tenant change counters that streams wait on, from threads or coroutines."""
+
+    def __init__(self):
+        self._changes = Counter()
+        self._condition = threading.Condition()
+        self._waiters = set()
+
+    def notify(self, tenant_id):
+        with self._condition:
+            self._changes[tenant_id] += 1
+            self._condition.notify_all()
+            for waiter_tenant, loop, event in self._waiters:
+                if waiter_tenant == tenant_id:
+                    loop.call_soon_threadsafe(event.set)
+
+    def current(self, tenant_id):
+        with self._condition:
+            return self._changes[tenant_id]
+
+    def wait(self, tenant_id, seen, timeout):
+        """Block until a change after ``seen`` or ``timeout`` seconds."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._changes[tenant_id] != seen, timeout)
+
+    async def wait_async(self, tenant_id, seen, timeout):
+        import asyncio  # only the ASGI app needs it; keeps it out of WSGI startup
+
+        waiter = (tenant_id, asyncio.get_running_loop(), asyncio.Event())
+        with self._condition:
+            if self._changes[tenant_id] != seen:
+                return
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[2].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._waiters.discard(waiter)
+
+
+notifier = ChangeNotifier()
+stream_slots = threading.BoundedSemaphore(MAX_CONTACT_STREAMS)
+
+
+def resume_version(last_event_id=None, since=None):
+    """Version to resume after, or None to start from the current one."""
+    value = last_event_id or since
+    return parse_since(value) if value else None
+
+
+# Fields of the content_versions state a stream reads.
+STATE_PROJECTION = {'version': 1, 'pending': 1, 'floor': 1}
+
+
+def read_state(db, tenant_id):
+    return db[VERSIONS_COLLECTION].find_one({'_id': tenant_id}, STATE_PROJECTION)
+
+
+def current_version(db, tenant_id):
+    """The tenant's committed watermark."""
+    return committed_version(read_state(db, tenant_id))
+
+
+def needs_resync(version, state):
+    """Whether a stream at ``version`` is behind a floor that is fully written."""
+    floor = (state or {}).get('floor', 0)
+    return version < floor <= committed_version(state)
+
+
+def change_queries(tenant_id, since, until):
+    """(contacts filter, tombstones filter) for changes in (``since``, ``until``]."""
+    versions = {'$gt': since, '$lte': until}
+    return (
+        scoped({'version': versions}, tenant_id),
+        scoped({'collection': 'contacts', 'version': versions}, tenant_id),
+    )
+
+
+def group_changes(contacts, tombstones):
+    """[(version, {'upserted': [...], 'deleted': [...]})] in version order."""
+    changes = {}
+    for doc in contacts:
+        changes.setdefault(doc['version'], {'upserted': [], 'deleted': []})['upserted'].append(
+            serialize_doc(doc)
+        )
+    for tombstone in tombstones:
+        changes.setdefault(tombstone['version'], {'upserted': [], 'deleted': []})['deleted'].append(
+            tombstone['doc_id']
+        )
+    return sorted(changes.items())
+
+
+def format_event(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+RETRY_FRAME = f"retry: {STREAM_RETRY_MS}\n\n"
+HEARTBEAT_FRAME = ": heartbeat\n\n"
+
+
+def contact_events(db, tenant_id, version):
+    """SSE frames for contact changes after ``version``, for STREAM_MAX_SECONDS."""
+    started = last_sent = time.monotonic()
+    yield RETRY_FRAME
+    while time.monotonic() - started < STREAM_MAX_SECONDS:
+        seen = notifier.current(tenant_id)
+        expire_contacts(db, tenant_id)
+        # Read before the changes, so every write up to it is visible below.
+        state = read_state(db, tenant_id)
+        watermark = committed_version(state)
+        if needs_resync(version, state):
+            yield format_event({'version': watermark}, event='resync', event_id=watermark)
+            last_sent = time.monotonic()
+            version = watermark
+        elif watermark > version:
+            contacts_query, tombstones_query = change_queries(tenant_id, version, watermark)
+            changes = group_changes(
+                db.contacts.find(contacts_query),
+                db[TOMBSTONES_COLLECTION].find(tombstones_query, {'doc_id': 1, 'version': 1}),
+            )
+            for event_version, change in changes:
+                yield format_event(change, event='contacts', event_id=event_version)
+                last_sent = time.monotonic()
+            version = watermark
+        if time.monotonic() - last_sent >= STREAM_HEARTBEAT_SECONDS:
+            yield HEARTBEAT_FRAME
+            last_sent = time.monotonic()
+        notifier.wait(tenant_id, seen, min(STREAM_POLL_SECONDS, STREAM_HEARTBEAT_SECONDS))
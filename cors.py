@@ -0,0 +1,88 @@
+"""
+CORS with a preflight fast path.
+
+The static site and the API are separate origins, so browsers preflight
+any request that isn't "simple" (a JSON POST, a custom header). Preflights
+are answered by PreflightMiddleware from headers built once at import,
+in front of tenant resolution and Flask routing, so they never touch
+MongoDB; with a long Access-Control-Max-Age the browser then reuses the
+answer instead of repeating it before every call. Actual responses get
+their CORS headers from flask-cors with the same allowlist.
+
+    CORS_ORIGINS   comma-separated allowed origins, or * (the default)
+    CORS_MAX_AGE   seconds browsers may cache a preflight (Chrome caps at 7200)
+"""
+
+import os
+
+from flask_cors import CORS
+
+import metrics
+
+CORS_ORIGINS = [o.strip().rstrip('/') for o in os.environ.get('CORS_ORIGINS', '*').split(',') if o.strip()]
+CORS_MAX_AGE = int(os.environ.get('CORS_MAX_AGE', 86400))
+ALLOW_ANY_ORIGIN = '*' in CORS_ORIGINS
+
+ALLOWED_METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'DELETE', 'OPTIONS')
+ALLOWED_HEADERS = (
+    'Content-Type', 'Authorization', 'X-Requested-With', 'X-Request-ID', 'X-Profile', 'X-Profile-Token',
+)
+# Readable by scripts on the allowed origins.
+EXPOSED_HEADERS = ('Retry-After', 'X-Request-ID', 'X-Profile-ID')
+
+_PREFLIGHT_HEADERS = [
+    ('Access-Control-Allow-Methods', ', '.join(ALLOWED_METHODS)),
+    ('Access-Control-Allow-Headers', ', '.join(ALLOWED_HEADERS)),
+    ('Access-Control-Max-Age', str(CORS_MAX_AGE)),
+    ('Content-Length', '0'),
+]
+_REJECTED_HEADERS = [('Content-Length', '0')]
+if not ALLOW_ANY_ORIGIN:
+    _PREFLIGHT_HEADERS.append(('Vary', 'Origin'))
+    _REJECTED_HEADERS.append(('Vary', 'Origin'))
+
+
+def allowed_origin(origin):
+    """Access-Control-Allow-Origin value for ``origin``, or None if not allowed."""
+    if ALLOW_ANY_ORIGIN:
+        return '*'
+    if origin and origin.rstrip('/') in CORS_ORIGINS:
+        return origin
+    return None
+
+
+def preflight_headers(origin):
+    """Headers of the 204 answering a preflight from ``origin``."""
+    allow_origin = allowed_origin(origin)
+    if allow_origin is None:
+        metrics.incr('cors_preflights_rejected')
+        # No CORS headers, so the browser refuses the real request.
+        return _REJECTED_HEADERS
+    metrics.incr('cors_preflights')
+    return [('Access-Control-Allow-Origin', allow_origin)] + _PREFLIGHT_HEADERS
+
+
+def is_preflight(method, origin, requested_method):
+    return method == 'OPTIONS' and bool(origin) and bool(requested_method)
+
+
+class PreflightMiddleware:
+    """Answer CORS preflights before anything else sees the request."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        origin = environ.get('HTTP_ORIGIN')
+        if not is_preflight(environ.get('REQUEST_METHOD'), origin,
+                            environ.get('HTTP_ACCESS_CONTROL_REQUEST_METHOD')):
+            return self.wsgi_app(environ, start_response)
+        start_response('204 No Content', preflight_headers(origin))
+        return []
+
+
+def init_cors(app):
+    """Call after init_tenancy so preflights skip tenant resolution."""
+    CORS(app, origins=CORS_ORIGINS, max_age=CORS_MAX_AGE,
+         allow_headers=list(ALLOWED_HEADERS), expose_headers=list(EXPOSED_HEADERS))
+    app.wsgi_app = PreflightMiddleware(app.wsgi_app)
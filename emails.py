@@ -0,0 +1,127 @@
+from datetime import datetime
+
+
+def notification_email(name, email, subject, message):
+    """Subject, text and HTML bodies of the notification sent to the site owner."""
+    html_body = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+            .content {{ background: #f8f9fa; padding: 30px; border: 1px solid #e9ecef; }}
+            .field {{ margin-bottom: 20px; }}
+            .label {{ font-weight: bold; color: #495057; margin-bottom: 5px; display: block; }}
+            .value {{ background: white; padding: 10px; border-radius: 5px; border: 1px solid #dee2e6; }}
+            .message-box {{ background: white; padding: 20px; border-radius: 5px; border: 1px solid #dee2e6; white-space: pre-wrap; }}
+            .footer {{ background: #343a40; color: white; padding: 20px; text-align: center; border-radius: 0 0 10px 10px; }}
+            .timestamp {{ color: #6c757d; font-size: 14px; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>New Portfolio Contact!</h1>
+                <p>Someone wants to connect with you</p>
+            </div>
+            <div class="content">
+                <div class="field">
+                    <span class="label">Name:</span>
+                    <div class="value">{name}</div>
+                </div>
+                <div class="field">
+                    <span class="label">Email:</span>
+                    <div class="value">{email}</div>
+                </div>
+                <div class="field">
+                    <span class="label">Subject:</span>
+                    <div class="value">{subject}</div>
+                </div>
+                <div class="field">
+                    <span class="label">Message:</span>
+                    <div class="message-box">{message}</div>
+                </div>
+                <div class="field">
+                    <span class="label">Received:</span>
+                    <div class="timestamp">{datetime.now().strftime('%B %d, %Y at %I:%M %p')}</div>
+                </div>
+            </div>
+            <div class="footer">
+                <p>Reply directly to this email to respond to {name}</p>
+                <p style="font-size: 12px; margin-top: 10px;">Sent from your portfolio website contact form</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+    text_body = f"""
+NEW PORTFOLIO CONTACT
+
+Name: {name}
+Email: {email}
+Subject: {subject}
+Received: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+
+Message:
+{message}
+
+---
+Reply directly to this email to respond to {name}.
+Sent from your portfolio website contact form.
+    """
+
+    return {
+        'subject': f"Portfolio Contact: {subject}",
+        'body': text_body,
+        'html': html_body,
+    }
+
+
+def confirmation_email(name, subject):
+    """Subject and HTML body of the confirmation sent back to the sender."""
+    confirmation_html = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+            .content {{ background: #f8f9fa; padding: 30px; border: 1px solid #e9ecef; }}
+            .footer {{ background: #343a40; color: white; padding: 20px; text-align: center; border-radius: 0 0 10px 10px; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>Message Received!</h1>
+                <p>Thanks for reaching out</p>
+            </div>
+            <div class="content">
+                <p>Hi {name}!</p>
+                <p>Thank you for your message about "<strong>{subject}</strong>". I've received your inquiry and I'm excited to connect with you!</p>
+                <p>I'll get back to you as soon as possible, usually within 24-48 hours.</p>
+                <p>In the meantime, feel free to:</p>
+                <ul>
+                    <li>Check out my latest projects on the website</li>
+                    <li>Connect with me on social media</li>
+                    <li>Explore my GitHub repositories</li>
+                </ul>
+                <p>Looking forward to our collaboration!</p>
+                <p>Best regards,<br>Shoaib</p>
+            </div>
+            <div class="footer">
+                <p>This is an automated confirmation. Please don't reply to this email.</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+    return {
+        'subject': "Thanks for reaching out! - Message Received",
+        'html': confirmation_html,
+    }
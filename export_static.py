@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Static JSON Export
+Renders every public GET endpoint to content-hashed JSON files plus a
+manifest, so the static site can serve portfolio data without waking the
+API. Re-run after seed.py.
+
+    python export_static.py [output_dir]
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from urllib.parse import quote, urlencode
+
+# Rendering every endpoint must not count as page and project views.
+os.environ.setdefault('ANALYTICS_DISABLED', '1')
+
+DEFAULT_OUTPUT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'frontend', 'public', 'data'
+)
+MANIFEST_NAME = 'manifest.json'
+
+# Characters encodeURIComponent leaves unescaped beyond quote()'s defaults.
+EXTRA_SAFE = "!'()*"
+
+STATIC_ENDPOINTS = [
+    '/api/developer',
+    '/api/skills',
+    '/api/skills?featured=true',
+    '/api/skills/categories',
+    '/api/projects',
+    '/api/projects?featured=true',
+    '/api/experience',
+    '/api/education',
+    '/api/certifications',
+    '/api/achievements',
+    '/api/technologies',
+    '/api/stats',
+]
+
+
+def discover_endpoints(client):
+    """Static endpoints plus per-category, per-project and per-technology variants."""
+    paths = list(STATIC_ENDPOINTS)
+
+    # Query strings are encoded the way URLSearchParams encodes them in
+    # frontend/src/utils/api.ts, so manifest keys match client requests.
+    categories = client.get('/api/skills/categories').get_json() or []
+    for category in categories:
+        paths.append(f"/api/skills?{urlencode({'category': category})}")
+        paths.append(f"/api/skills?{urlencode({'category': category, 'featured': 'true'})}")
+
+    for project in client.get('/api/projects').get_json() or []:
+        paths.append(f"/api/projects/{project['id']}")
+
+    for tech in client.get('/api/technologies').get_json() or []:
+        name = tech['name']
+        paths.append(f"/api/technologies/{quote(name, safe=EXTRA_SAFE)}/usage")
+        paths.append(f"/api/projects?{urlencode({'technology': name})}")
+        paths.append(f"/api/experience?{urlencode({'technology': name})}")
+
+    return paths
+
+
+def file_stem(path):
+    """'/api/skills?category=Backend' -> 'skills-category-backend'"""
+    stem = path[len('/api/'):] if path.startswith('/api/') else path.lstrip('/')
+    stem = re.sub(r'[^A-Za-z0-9]+', '-', stem).strip('-')
+    return stem.lower() or 'index'
+
+
+def export_static(output_dir=DEFAULT_OUTPUT_DIR):
+    """Write one hashed JSON file per endpoint and a manifest mapping paths to files."""
+    from app import app
+
+    os.makedirs(output_dir, exist_ok=True)
+    client = app.test_client()
+    manifest = {}
+    written = set()
+
+    for path in discover_endpoints(client):
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+        if response.status_code != 200:
+            print(f"   ⚠️  Skipping {path}: status {response.status_code}")
+            continue
+        body = json.dumps(response.get_json(), separators=(',', ':'), sort_keys=True).encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        filename = f"{file_stem(path)}.{digest}.json"
+        with open(os.path.join(output_dir, filename), 'wb') as f:
+            f.write(body)
+        manifest[path] = filename
+        written.add(filename)
+
+    # Remove files from previous exports that are no longer referenced
+    for name in os.listdir(output_dir):
+        if name.endswith('.json') and name != MANIFEST_NAME and name not in written:
+            os.remove(os.path.join(output_dir, name))
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"Exported {len(manifest)} endpoints to {output_dir}")
+    return manifest
+
+
+if __name__ == "__main__":
+    export_static(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OUTPUT_DIR)
@@ -12,6 +12,7 @@ import EnhancedProjects from './components/EnhancedProjects';
 import { ScrollProgressIndicator, ScrollToTopButton } from './components/ScrollIndicators';
 import { ModernLoader, ErrorScreen } from './components/ModernLoader';
 import DataWarning from './components/DataWarning';
+import { thumbnailSrcSet } from './utils/api';
 import Footer from './components/Footer';
 import './styles/premium-design.css';
 
@@ -117,15 +118,24 @@ const SimpleProjectsSection: React.FC<{ projects: any[] }> = ({ projects }) => (
             >
               {project.image_url && (
                 <div className="h-48 bg-gradient-to-br from-blue-500 to-purple-500 flex items-center justify-center">
-                  <img
-                    src={project.image_url}
-                    alt={project.title}
-                    className="w-full h-full object-cover"
-                    onError={(e) => {
-                      e.currentTarget.style.display = 'none';
-                      e.currentTarget.parentElement!.innerHTML = `<div class="text-white text-4xl">📱</div>`;
-                    }}
-                  />
+                  <picture className="w-full h-full">
+                    {(['avif', 'webp'] as const).map((format) => {
+                      const srcSet = thumbnailSrcSet(project.thumbnails, project.image_url, format);
+                      return srcSet ? (
+                        <source key={format} type={`image/${format}`} srcSet={srcSet} sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw" />
+                      ) : null;
+                    })}
+                    <img
+                      src={project.image_url}
+                      alt={project.title}
+                      loading="lazy"
+                      className="w-full h-full object-cover"
+                      onError={(e) => {
+                        e.currentTarget.style.display = 'none';
+                        e.currentTarget.parentElement!.parentElement!.innerHTML = `<div class="text-white text-4xl">📱</div>`;
+                      }}
+                    />
+                  </picture>
                 </div>
               )}
               
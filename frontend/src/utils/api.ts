@@ -2,13 +2,43 @@ import axios from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5001';
 
+// No default Content-Type: axios sets application/json on requests with a
+// JSON body, and GETs without it are "simple" and skip the CORS preflight.
 export const api = axios.create({
   baseURL: API_BASE_URL,
-  headers: {
-    'Content-Type': 'application/json',
-  },
 });
 
+// Public data exported by export_static.py, served by the static site.
+const STATIC_DATA_URL = `${process.env.PUBLIC_URL || ''}/data`;
+
+let manifestPromise: Promise<Record<string, string>> | null = null;
+
+const loadManifest = (): Promise<Record<string, string>> => {
+  if (!manifestPromise) {
+    manifestPromise = axios
+      .get(`${STATIC_DATA_URL}/manifest.json`)
+      .then(res => (res.data && typeof res.data === 'object' ? res.data : {}))
+      .catch(() => ({}));
+  }
+  return manifestPromise;
+};
+
+// Read a public GET endpoint from the static export, falling back to the API.
+export const getPublic = async <T>(path: string): Promise<T> => {
+  const key = path.replace(/\?$/, '');
+  const manifest = await loadManifest();
+  const file = manifest[key];
+  if (file) {
+    try {
+      const res = await axios.get(`${STATIC_DATA_URL}/${file}`);
+      return res.data;
+    } catch {
+      // Fall back to the API below
+    }
+  }
+  return api.get(key).then(res => res.data);
+};
+
 export interface Developer {
   name: string;
   title: string;
@@ -36,10 +66,30 @@ export interface Project {
   github_url: string;
   live_url?: string;
   image_url: string;
+  thumbnails?: Thumbnail[];
   featured: boolean;
   created_date: string;
 }
 
+export interface Thumbnail {
+  src: string;
+  url: string;
+  width: number;
+  height: number;
+  format: 'avif' | 'webp';
+}
+
+// srcset of one image's thumbnails in a single format, e.g. for <source>.
+export const thumbnailSrcSet = (
+  thumbnails: Thumbnail[] | undefined,
+  src: string,
+  format: Thumbnail['format']
+): string =>
+  (thumbnails || [])
+    .filter((t) => t.src === src && t.format === format)
+    .map((t) => `${t.url} ${t.width}w`)
+    .join(', ');
+
 export interface Experience {
   id: number;
   title: string;
@@ -64,31 +114,99 @@ export interface Stats {
   coffee_cups: number;
 }
 
+export interface SearchResult {
+  type: 'project' | 'skill' | 'experience';
+  id: string;
+  title: string;
+  snippet: string;
+  category: string | null;
+  technologies: string[];
+  score: number;
+}
+
+export interface SearchResponse {
+  query: string;
+  total: number;
+  results: SearchResult[];
+  facets: {
+    type: Record<string, number>;
+    category: Record<string, number>;
+    technology: Record<string, number>;
+  };
+}
+
+export interface TechnologyUsage {
+  name: string;
+  projects: { id: string; title: string }[];
+  experience: { id: string; title: string; company: string }[];
+  project_count: number;
+  experience_count: number;
+  total: number;
+}
+
+export interface DeltaResponse<T> {
+  version: number;
+  since: number;
+  full: boolean;
+  upserted: T[];
+  deleted: string[];
+}
+
+// Merge a ?since= response into a locally stored copy of a list endpoint.
+export const applyDelta = <T extends { id: string | number }>(
+  local: T[],
+  delta: DeltaResponse<T>
+): T[] => {
+  if (delta.full) return delta.upserted;
+  const changed = new Set([...delta.deleted, ...delta.upserted.map((item) => String(item.id))]);
+  return [...local.filter((item) => !changed.has(String(item.id))), ...delta.upserted];
+};
+
+// Changes to a list endpoint since a version; pass 0 for a first full load.
+export const getChanges = <T>(path: string, since: number): Promise<DeltaResponse<T>> => {
+  const separator = path.includes('?') ? '&' : '?';
+  return api.get(`${path}${separator}since=${since}`).then(res => res.data);
+};
+
 // API functions
 export const getDeveloperInfo = (): Promise<Developer> =>
-  api.get('/api/developer').then(res => res.data);
+  getPublic<Developer>('/api/developer');
 
 export const getSkills = (category?: string, featured?: boolean): Promise<Skill[]> => {
   const params = new URLSearchParams();
   if (category) params.append('category', category);
   if (featured) params.append('featured', 'true');
-  return api.get(`/api/skills?${params.toString()}`).then(res => res.data);
+  return getPublic<Skill[]>(`/api/skills?${params.toString()}`);
 };
 
 export const getSkillCategories = (): Promise<string[]> =>
-  api.get('/api/skills/categories').then(res => res.data);
+  getPublic<string[]>('/api/skills/categories');
 
 export const getProjects = (featured?: boolean): Promise<Project[]> =>
-  api.get(`/api/projects${featured ? '?featured=true' : ''}`).then(res => res.data);
+  getPublic<Project[]>(`/api/projects${featured ? '?featured=true' : ''}`);
 
 export const getProject = (id: number): Promise<Project> =>
-  api.get(`/api/projects/${id}`).then(res => res.data);
+  getPublic<Project>(`/api/projects/${id}`);
+
+export const getProjectsByIds = (
+  ids: Array<string | number>
+): Promise<{ projects: Project[]; missing: string[] }> =>
+  api.get(`/api/projects?ids=${ids.map(id => encodeURIComponent(String(id))).join(',')}`).then(res => res.data);
 
 export const getExperience = (): Promise<Experience[]> =>
-  api.get('/api/experience').then(res => res.data);
+  getPublic<Experience[]>('/api/experience');
 
 export const getStats = (): Promise<Stats> =>
-  api.get('/api/stats').then(res => res.data);
+  getPublic<Stats>('/api/stats');
+
+export const getTechnologyUsage = (name: string): Promise<TechnologyUsage> =>
+  getPublic<TechnologyUsage>(`/api/technologies/${encodeURIComponent(name)}/usage`);
+
+export const search = (q: string, type?: SearchResult['type']): Promise<SearchResponse> => {
+  const params = new URLSearchParams({ q });
+  if (type) params.append('type', type);
+  return api.get(`/api/search?${params.toString()}`).then(res => res.data);
+};
 
 export const sendContactMessage = (message: ContactMessage): Promise<{ message: string }> =>
   api.post('/api/contact', message).then(res => res.data);
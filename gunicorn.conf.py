@@ -0,0 +1,92 @@
+"""
+Gunicorn configuration.
+
+Workers and threads are sized from the CPUs and memory available to the
+container; every value can be overridden through the environment:
+
+    WEB_CONCURRENCY       number of worker processes
+    GUNICORN_THREADS      threads per worker (gthread)
+    WORKER_MEMORY_MB      expected resident size of one worker
+    GUNICORN_TIMEOUT      worker timeout in seconds
+    MAX_REQUESTS          requests served before a worker is recycled
+"""
+
+import multiprocessing
+import os
+
+# Let the master import the app without seeding; startup() runs in when_ready.
+os.environ.setdefault('DEFER_STARTUP', '1')
+
+
+def _memory_limit_mb():
+    """Container memory limit from cgroups, falling back to total RAM."""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < 1 << 50:
+            return int(value) // (1024 * 1024)
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return 512
+
+
+def _default_workers():
+    by_cpu = multiprocessing.cpu_count() * 2 + 1
+    # Keep ~20% headroom for the master and page cache.
+    by_memory = int(_memory_limit_mb() * 0.8) // int(os.environ.get('WORKER_MEMORY_MB', 120))
+    return max(1, min(by_cpu, by_memory))
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', _default_workers()))
+# Requests mostly wait on MongoDB Atlas and SMTP, so threads are cheap concurrency.
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to guard against memory creep.
+max_requests = int(os.environ.get('MAX_REQUESTS', 1000))
+max_requests_jitter = max(1, max_requests // 10)
+
+# No accesslog: request_log.py writes the sampled JSON access log.
+errorlog = '-'
+
+
+def when_ready(server):
+    """Seed the database once, in the master, before workers fork."""
+    from app import startup
+
+    startup()
+    server.log.info("Workers: %s, threads per worker: %s", workers, threads)
+
+
+def post_fork(server, worker):
+    """Each worker gets its own MongoClient instead of the master's."""
+    from app import app
+    from models import reset_mongo_client
+
+    reset_mongo_client(app)
+
+
+def worker_exit(server, worker):
+    """Write this worker's pending analytics counts before it goes away."""
+    from analytics import counters
+
+    try:
+        counters.flush()
+    except Exception:
+        server.log.exception("Failed to flush analytics counters")
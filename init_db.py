@@ -1,257 +1,302 @@
-from models import db, Developer, Skill, Project, Technology, ProjectTechnology, Experience, ExperienceTechnology, SiteSettings
-from datetime import date
 import json
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
-def init_database():
-    """Initialize the database with tables and seed data"""
-    
-    # Create all tables
-    db.create_all()
-    
-    # Check if data already exists
-    if Developer.query.first():
-        print("Database already initialized with data.")
-        return
-    
-    print("Initializing database with seed data...")
-    
-    # Seed Developer Info
-    developer = Developer(
-        name="Shoaib Shaikh",
-        title="Full Stack Developer",
-        experience_years=3,
-        bio="Passionate full-stack developer with 3+ years of experience in modern web development. Specialized in React, Node.js, Python Flask, and cloud technologies. Creating innovative solutions with clean, efficient code.",
-        email="codeeshoaib@gmail.com",
-        phone="+91 9876543210",
-        location="Mumbai, India",
-        linkedin="https://linkedin.com/in/shaikhshoaib8879",
-        github="https://github.com/shaikhshoaib8879",
-        resume_url="/static/resume.pdf"
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from models import mongo, technology_keys
+from retention import ensure_retention_index
+from technology_usage import rebuild_technology_usage
+from tenancy import DEFAULT_TENANT, assign_default_tenant, register_tenant
+from thumbnails import add_thumbnails
+from versioning import TOMBSTONES_COLLECTION, raise_floor, versioned_write
+
+SEED_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seed_data.json')
+
+# Required fields per collection, checked once before anything is written.
+REQUIRED_FIELDS = {
+    'developer': ['name', 'title', 'email'],
+    'technologies': ['name', 'category'],
+    'skills': ['name', 'level', 'category'],
+    'projects': ['title', 'description', 'technologies'],
+    'experience': ['title', 'company', 'start_date'],
+    'education': ['degree', 'institution', 'start_date'],
+    'certifications': ['name'],
+    'achievements': ['description'],
+    'site_settings': ['key', 'value'],
+}
+
+# Fields stored as ISO dates ("YYYY-MM-DD") in the data file.
+DATE_FIELDS = ('start_date', 'end_date')
+
+# Collections whose documents carry created_at / updated_at stamps.
+TIMESTAMP_FIELDS = {
+    'developer': ('created_at', 'updated_at'),
+    'projects': ('created_at', 'updated_at'),
+    'experience': ('created_at',),
+    'education': ('created_at',),
+    'certifications': ('created_at',),
+    'achievements': ('created_at',),
+}
+
+# Every index is led by tenant_id, so each portfolio's queries touch only
+# its own slice of a shared collection.
+TENANT = ('tenant_id', ASCENDING)
+
+# Collections filtered by ?technology=, through a lowercased copy of the list.
+TECHNOLOGY_COLLECTIONS = ('projects', 'experience')
+
+INDEXES = {
+    'developer': [IndexModel([TENANT])],
+    'technologies': [IndexModel([TENANT, ('name', ASCENDING)], unique=True)],
+    'skills': [
+        IndexModel([TENANT, ('level', DESCENDING)]),
+        IndexModel([TENANT, ('category', ASCENDING), ('level', DESCENDING)]),
+    ],
+    'projects': [
+        IndexModel([TENANT, ('created_at', DESCENDING)]),
+        IndexModel([TENANT, ('featured', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([TENANT, ('technologies_lc', ASCENDING)]),
+    ],
+    'experience': [
+        IndexModel([TENANT, ('start_date', DESCENDING)]),
+        IndexModel([TENANT, ('technologies_lc', ASCENDING)]),
+    ],
+    'education': [IndexModel([TENANT, ('start_date', DESCENDING)])],
+    'certifications': [IndexModel([TENANT])],
+    'achievements': [IndexModel([TENANT])],
+    'site_settings': [IndexModel([TENANT, ('key', ASCENDING)], unique=True)],
+    'contacts': [
+        IndexModel([TENANT, ('created_at', DESCENDING)]),
+        IndexModel([TENANT, ('is_read', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([TENANT, ('version', ASCENDING)]),
+        IndexModel([TENANT, ('expire_at', ASCENDING)]),
+    ],
+    'technology_usage': [IndexModel([TENANT])],
+    'analytics': [IndexModel([TENANT, ('kind', ASCENDING), ('bucket', DESCENDING)])],
+    'tombstones': [IndexModel([TENANT, ('collection', ASCENDING), ('version', ASCENDING)])],
+}
+
+# Indexes from before tenant_id existed; the unique ones would reject a
+# second tenant's technologies and settings.
+LEGACY_INDEXES = {
+    'technologies': ['name_1'],
+    'skills': ['level_-1', 'category_1_level_-1'],
+    'projects': ['created_at_-1', 'featured_1_created_at_-1', 'technologies_1'],
+    'experience': ['start_date_-1', 'technologies_1'],
+    'education': ['start_date_-1'],
+    'site_settings': ['key_1'],
+    'contacts': ['created_at_-1', 'is_read_1_created_at_-1'],
+}
+
+LOCK_COLLECTION = 'bootstrap_lock'
+LOCK_ID = 'init_database'
+LOCK_TTL_SECONDS = 120
+LOCK_WAIT_SECONDS = 60
+
+
+def load_seed_data(path=SEED_DATA_PATH):
+    """Load and validate the declarative seed data file."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    validate_seed_data(data)
+    return data
+
+
+def validate_seed_data(data):
+    """Raise ValueError listing every problem found in the seed data."""
+    errors = []
+    for name in data:
+        if name not in REQUIRED_FIELDS:
+            errors.append(f"unknown collection '{name}'")
+    for name, required in REQUIRED_FIELDS.items():
+        docs = data.get(name)
+        if not isinstance(docs, list) or not docs:
+            errors.append(f"'{name}' must be a non-empty list")
+            continue
+        for i, doc in enumerate(docs):
+            missing = [field for field in required if doc.get(field) is None]
+            if missing:
+                errors.append(f"{name}[{i}] missing {', '.join(missing)}")
+            for field in DATE_FIELDS:
+                value = doc.get(field)
+                if value is None:
+                    continue
+                try:
+                    datetime.fromisoformat(value)
+                except (TypeError, ValueError):
+                    errors.append(f"{name}[{i}].{field} is not an ISO date: {value!r}")
+    if errors:
+        raise ValueError("Invalid seed data:\n  " + "\n  ".join(errors))
+
+
+def build_documents(data, now=None, tenant_id=DEFAULT_TENANT, version=None):
+    """Turn validated seed data into one tenant's insertable documents."""
+    now = now or datetime.utcnow()
+    collections = {}
+    for name, docs in data.items():
+        stamps = TIMESTAMP_FIELDS.get(name, ())
+        prepared = []
+        for doc in docs:
+            doc = dict(doc, tenant_id=tenant_id)
+            if version is not None:
+                doc['version'] = version
+            for field in DATE_FIELDS:
+                if doc.get(field):
+                    doc[field] = datetime.fromisoformat(doc[field])
+            for field in stamps:
+                doc[field] = now
+            if name in TECHNOLOGY_COLLECTIONS:
+                doc['technologies_lc'] = technology_keys(doc.get('technologies'))
+            prepared.append(doc)
+        collections[name] = prepared
+    return collections
+
+
+def _seed_collection(db, name, docs):
+    collection = db[name]
+    if docs:
+        collection.insert_many(docs, ordered=False)
+    if name in INDEXES:
+        collection.create_indexes(INDEXES[name])
+    return name, len(docs)
+
+
+def _acquire_lock(db, lock_id, owner):
+    """Try to take a bootstrap lock; expired locks can be taken over."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=LOCK_TTL_SECONDS)
+    locks = db[LOCK_COLLECTION]
+    try:
+        locks.insert_one({'_id': lock_id, 'owner': owner, 'expires_at': expires_at})
+        return True
+    except DuplicateKeyError:
+        pass
+    taken = locks.find_one_and_update(
+        {'_id': lock_id, 'expires_at': {'$lt': now}},
+        {'$set': {'owner': owner, 'expires_at': expires_at}}
     )
-    db.session.add(developer)
-    
-    # Seed Technologies
-    technologies_data = [
-        {"name": "Python", "category": "backend", "color": "#3776ab"},
-        {"name": "JavaScript", "category": "frontend", "color": "#f7df1e"},
-        {"name": "React", "category": "frontend", "color": "#61dafb"},
-        {"name": "Node.js", "category": "backend", "color": "#339933"},
-        {"name": "PostgreSQL", "category": "database", "color": "#336791"},
-        {"name": "MongoDB", "category": "database", "color": "#47a248"},
-        {"name": "AWS", "category": "cloud", "color": "#ff9900"},
-        {"name": "Docker", "category": "devops", "color": "#2496ed"},
-        {"name": "Git", "category": "tools", "color": "#f05032"},
-        {"name": "HTML/CSS", "category": "frontend", "color": "#e34f26"},
-        {"name": "Flask", "category": "backend", "color": "#000000"},
-        {"name": "TypeScript", "category": "frontend", "color": "#3178c6"},
-        {"name": "Tailwind CSS", "category": "frontend", "color": "#06b6d4"},
-        {"name": "FastAPI", "category": "backend", "color": "#009688"},
-        {"name": "scikit-learn", "category": "ml", "color": "#f7931e"},
-        {"name": "D3.js", "category": "frontend", "color": "#f68e56"},
-        {"name": "OpenWeather API", "category": "api", "color": "#eb6e4b"},
-        {"name": "Stripe API", "category": "api", "color": "#635bff"},
-        {"name": "Socket.io", "category": "backend", "color": "#010101"}
-    ]
-    
-    technologies = {}
-    for tech_data in technologies_data:
-        tech = Technology(**tech_data)
-        db.session.add(tech)
-        technologies[tech_data["name"]] = tech
-    
-    # Seed Skills
-    skills_data = [
-        {"name": "Python", "level": 90, "category": "Backend", "is_featured": True},
-        {"name": "JavaScript", "level": 85, "category": "Frontend", "is_featured": True},
-        {"name": "React", "level": 88, "category": "Frontend", "is_featured": True},
-        {"name": "Node.js", "level": 80, "category": "Backend", "is_featured": False},
-        {"name": "PostgreSQL", "level": 85, "category": "Database", "is_featured": True},
-        {"name": "MongoDB", "level": 75, "category": "Database", "is_featured": False},
-        {"name": "AWS", "level": 70, "category": "Cloud", "is_featured": False},
-        {"name": "Docker", "level": 75, "category": "DevOps", "is_featured": False},
-        {"name": "Git", "level": 90, "category": "Tools", "is_featured": True},
-        {"name": "HTML/CSS", "level": 92, "category": "Frontend", "is_featured": True}
-    ]
-    
-    for skill_data in skills_data:
-        skill = Skill(**skill_data)
-        db.session.add(skill)
-    
-    # Commit technologies and skills first so we can reference them
-    db.session.commit()
-    
-    # Seed Projects
-    projects_data = [
-        {
-            "title": "E-Commerce Platform",
-            "description": "Full-stack e-commerce solution with React frontend and Python backend",
-            "detailed_description": "A comprehensive e-commerce platform built with modern technologies. Features include user authentication, product catalog, shopping cart, payment processing with Stripe, order management, and admin dashboard. The backend is built with Flask and PostgreSQL, while the frontend uses React with TypeScript for a robust user experience.",
-            "github_url": "https://github.com/johndoe/ecommerce-platform",
-            "live_url": "https://ecommerce-demo.com",
-            "image_url": "/static/images/ecommerce.jpg",
-            "featured": True,
-            "status": "completed",
-            "start_date": date(2024, 1, 1),
-            "end_date": date(2024, 1, 15),
-            "technologies": ["React", "Python", "Flask", "PostgreSQL", "Stripe API"]
-        },
-        {
-            "title": "Task Management App",
-            "description": "Collaborative task management application with real-time updates",
-            "detailed_description": "A modern task management application that enables teams to collaborate effectively. Features real-time updates using Socket.io, drag-and-drop task organization, team member assignment, deadline tracking, and progress monitoring. Built with React frontend and Node.js backend with MongoDB for data persistence.",
-            "github_url": "https://github.com/johndoe/task-manager",
-            "live_url": "https://taskapp-demo.com",
-            "image_url": "/static/images/taskmanager.jpg",
-            "featured": True,
-            "status": "completed",
-            "start_date": date(2023, 8, 1),
-            "end_date": date(2023, 8, 20),
-            "technologies": ["React", "Node.js", "Socket.io", "MongoDB"]
-        },
-        {
-            "title": "Weather Dashboard",
-            "description": "Beautiful weather dashboard with data visualization",
-            "detailed_description": "An interactive weather dashboard that displays current conditions and forecasts with beautiful data visualizations. Features include location-based weather data, interactive charts using D3.js, responsive design with Tailwind CSS, and integration with OpenWeather API for real-time data.",
-            "github_url": "https://github.com/johndoe/weather-dashboard",
-            "live_url": "https://weather-demo.com",
-            "image_url": "/static/images/weather.jpg",
-            "featured": False,
-            "status": "completed",
-            "start_date": date(2023, 5, 1),
-            "end_date": date(2023, 5, 10),
-            "technologies": ["React", "D3.js", "OpenWeather API", "Tailwind CSS"]
-        },
-        {
-            "title": "Machine Learning Model API",
-            "description": "RESTful API for serving machine learning predictions",
-            "detailed_description": "A robust API service for serving machine learning models in production. Built with FastAPI for high performance, includes model versioning, input validation, logging, monitoring, and Docker containerization for easy deployment. Uses scikit-learn for model implementation and supports multiple ML algorithms.",
-            "github_url": "https://github.com/johndoe/ml-api",
-            "live_url": None,
-            "image_url": "/static/images/ml-api.jpg",
-            "featured": False,
-            "status": "completed",
-            "start_date": date(2023, 12, 1),
-            "end_date": date(2023, 12, 5),
-            "technologies": ["Python", "FastAPI", "scikit-learn", "Docker"]
-        }
-    ]
-    
-    for project_data in projects_data:
-        tech_names = project_data.pop("technologies")
-        project = Project(**project_data)
-        db.session.add(project)
-        db.session.flush()  # Get the project ID
-        
-        # Add project technologies
-        for tech_name in tech_names:
-            if tech_name in technologies:
-                project_tech = ProjectTechnology(
-                    project_id=project.id,
-                    technology_id=technologies[tech_name].id
-                )
-                db.session.add(project_tech)
-    
-    # Seed Experience
-    experience_data = [
-        {
-            "title": "Senior Software Developer",
-            "company": "Tech Solutions Inc.",
-            "company_url": "https://techsolutions.com",
-            "location": "San Francisco, CA",
-            "employment_type": "full-time",
-            "start_date": date(2023, 1, 1),
-            "end_date": None,
-            "description": "Lead development of web applications using React and Python. Mentored junior developers and improved code quality by 40%.",
-            "achievements": json.dumps([
-                "Led a team of 4 developers in building a customer portal that increased user engagement by 60%",
-                "Implemented CI/CD pipelines reducing deployment time from 2 hours to 15 minutes",
-                "Mentored 3 junior developers, with 2 receiving promotions within 6 months",
-                "Architected microservices infrastructure serving 100k+ daily active users"
-            ]),
-            "is_current": True,
-            "technologies": ["React", "Python", "AWS", "PostgreSQL"]
-        },
-        {
-            "title": "Full Stack Developer",
-            "company": "StartupXYZ",
-            "company_url": "https://startupxyz.com",
-            "location": "San Francisco, CA",
-            "employment_type": "full-time",
-            "start_date": date(2022, 1, 1),
-            "end_date": date(2022, 12, 31),
-            "description": "Developed and maintained multiple client projects. Implemented CI/CD pipelines and reduced deployment time by 60%.",
-            "achievements": json.dumps([
-                "Built 5 client applications serving 50k+ users combined",
-                "Reduced application load times by 70% through optimization",
-                "Implemented automated testing increasing code coverage to 85%",
-                "Designed and built RESTful APIs used by mobile and web applications"
-            ]),
-            "is_current": False,
-            "technologies": ["JavaScript", "Node.js", "MongoDB", "Docker"]
-        },
-        {
-            "title": "Junior Developer",
-            "company": "WebDev Agency",
-            "company_url": "https://webdevagency.com",
-            "location": "San Francisco, CA",
-            "employment_type": "full-time",
-            "start_date": date(2021, 6, 1),
-            "end_date": date(2021, 12, 31),
-            "description": "Worked on frontend development and API integration. Collaborated with design team to implement pixel-perfect UIs.",
-            "achievements": json.dumps([
-                "Delivered 15+ responsive web applications with 99% client satisfaction",
-                "Collaborated with designers to implement complex UI/UX requirements",
-                "Improved website performance scores by 40% through optimization",
-                "Contributed to open-source projects gaining 200+ GitHub stars"
-            ]),
-            "is_current": False,
-            "technologies": ["HTML/CSS", "JavaScript", "React"]
-        }
-    ]
-    
-    for exp_data in experience_data:
-        tech_names = exp_data.pop("technologies")
-        experience = Experience(**exp_data)
-        db.session.add(experience)
-        db.session.flush()  # Get the experience ID
-        
-        # Add experience technologies
-        for tech_name in tech_names:
-            if tech_name in technologies:
-                exp_tech = ExperienceTechnology(
-                    experience_id=experience.id,
-                    technology_id=technologies[tech_name].id
-                )
-                db.session.add(exp_tech)
-    
-    # Seed Site Settings
-    settings_data = [
-        {"key": "site_title", "value": "John Doe - Portfolio", "description": "Website title"},
-        {"key": "site_description", "value": "Professional portfolio of John Doe, Senior Software Developer", "description": "Website meta description"},
-        {"key": "github_repos_count", "value": "25", "description": "Number of GitHub repositories"},
-        {"key": "coffee_cups_count", "value": "1247", "description": "Coffee cups consumed (fun stat)"},
-        {"key": "analytics_id", "value": "", "description": "Google Analytics measurement ID"},
-        {"key": "contact_email", "value": "john.doe@example.com", "description": "Contact email address"},
-        {"key": "resume_url", "value": "/static/resume.pdf", "description": "Resume file URL"}
-    ]
-    
-    for setting_data in settings_data:
-        setting = SiteSettings(**setting_data)
-        db.session.add(setting)
-    
-    # Commit all changes
-    db.session.commit()
-    
-    print("Database initialized successfully with seed data!")
-    print("\nDatabase contains:")
-    print(f"- {Developer.query.count()} developer profile")
-    print(f"- {Technology.query.count()} technologies")
-    print(f"- {Skill.query.count()} skills")
-    print(f"- {Project.query.count()} projects")
-    print(f"- {Experience.query.count()} work experiences")
-    print(f"- {SiteSettings.query.count()} site settings")
+    return taken is not None
+
+
+def _release_lock(db, lock_id, owner):
+    db[LOCK_COLLECTION].delete_one({'_id': lock_id, 'owner': owner})
+
+
+def seed_database(db, data, reset=False, tenant_id=DEFAULT_TENANT):
+    """Insert one tenant's collections with one insert_many each, in parallel.
+
+    Indexes are created in the same pass. ``reset`` removes only this
+    tenant's documents. Returns {collection: count}.
+    """
+    # One version for the whole load; clients older than it resync in full.
+    with versioned_write(db, tenant_id) as version:
+        collections = build_documents(data, tenant_id=tenant_id, version=version)
+        add_thumbnails(collections.get('projects', []))
+        if reset:
+            for name in collections:
+                db[name].delete_many({'tenant_id': tenant_id})
+        # Collections without seed data (e.g. contacts) still get their indexes.
+        for name in INDEXES:
+            collections.setdefault(name, [])
+
+        with ThreadPoolExecutor(max_workers=len(collections)) as pool:
+            counts = dict(pool.map(lambda item: _seed_collection(db, *item), collections.items()))
+        ensure_retention_index(db)
+        counts['technology_usage'] = rebuild_technology_usage(db, tenant_id)
+        raise_floor(db, version, tenant_id)
+        # Every client older than the floor resyncs in full, so these are moot.
+        db[TOMBSTONES_COLLECTION].delete_many({'tenant_id': tenant_id, 'version': {'$lt': version}})
+
+    # Drop this process's in-memory views of the tenant's old data
+    import search
+    import skills_view
+    from response_cache import response_cache
+    search.invalidate(tenant_id)
+    skills_view.invalidate(tenant_id)
+    response_cache.clear(tenant_id)
+    return counts
+
+
+def add_technology_keys(db):
+    """Backfill technologies_lc for documents written before it existed.
+
+    Also drops the case-sensitive technologies index it replaces.
+    """
+    updated = 0
+    for name in TECHNOLOGY_COLLECTIONS:
+        requests = [
+            UpdateOne({'_id': doc['_id']}, {'$set': {'technologies_lc': technology_keys(doc.get('technologies'))}})
+            for doc in db[name].find({'technologies_lc': {'$exists': False}}, {'technologies': 1})
+        ]
+        if requests:
+            updated += db[name].bulk_write(requests, ordered=False).modified_count
+        db[name].create_indexes(INDEXES[name])
+        if 'tenant_id_1_technologies_1' in db[name].index_information():
+            db[name].drop_index('tenant_id_1_technologies_1')
+    return updated
+
+
+def upgrade_to_tenants(db):
+    """Move a single-portfolio database to the tenant layout in place.
+
+    Existing documents become DEFAULT_TENANT's, legacy indexes are
+    replaced by tenant-led ones and technology usage is rebuilt.
+    """
+    register_tenant(db, DEFAULT_TENANT)
+    updated = assign_default_tenant(db)
+    for name, index_names in LEGACY_INDEXES.items():
+        existing = db[name].index_information()
+        for index_name in index_names:
+            if index_name in existing:
+                db[name].drop_index(index_name)
+    for name, indexes in INDEXES.items():
+        db[name].create_indexes(indexes)
+    ensure_retention_index(db)
+    rebuild_technology_usage(db, DEFAULT_TENANT)
+    return updated
+
+
+def init_database(reset=False, data_path=SEED_DATA_PATH, tenant_id=DEFAULT_TENANT, hosts=()):
+    """Seed one tenant's portfolio from a seed data file.
+
+    Holds a per-tenant lock in MongoDB so concurrent workers don't all
+    seed at once; workers that lose the race wait for the winner to
+    release it and then find the data already there. Without ``reset`` an
+    already seeded tenant is left untouched.
+    """
+    db = mongo.db
+    data = load_seed_data(data_path)
+    register_tenant(db, tenant_id, hosts, name=data['developer'][0].get('name'))
+    db[LOCK_COLLECTION].create_index('expires_at', expireAfterSeconds=0)
+
+    lock_id = f"{LOCK_ID}:{tenant_id}"
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    deadline = time.monotonic() + LOCK_WAIT_SECONDS
+    while not _acquire_lock(db, lock_id, owner):
+        if time.monotonic() > deadline:
+            raise TimeoutError("Timed out waiting for the database bootstrap lock")
+        time.sleep(0.5)
+
+    try:
+        if not reset and db.developer.find_one({'tenant_id': tenant_id}, {'_id': 1}):
+            print("Database already initialized with data.")
+            return None
+        print("Initializing database with seed data...")
+        counts = seed_database(db, data, reset=reset, tenant_id=tenant_id)
+        print("Database initialized successfully!")
+        return counts
+    finally:
+        _release_lock(db, lock_id, owner)
+
 
 if __name__ == "__main__":
     from app import app
+
     with app.app_context():
         init_database()
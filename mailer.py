@@ -0,0 +1,48 @@
+"""
+Outgoing mail for the contact form.
+
+app.py imports this module on first use, so flask_mail, smtplib and the
+email.mime package stay out of cold starts.
+"""
+
+import smtplib
+import threading
+
+from flask import current_app
+from flask_mail import Connection, Mail
+
+_lock = threading.Lock()
+
+
+class TimedConnection(Connection):
+    """Flask-Mail connection whose SMTP socket gives up after ``timeout`` seconds."""
+
+    def __init__(self, mail, timeout):
+        super().__init__(mail)
+        self.timeout = timeout
+
+    def configure_host(self):
+        smtp = smtplib.SMTP_SSL if self.mail.use_ssl else smtplib.SMTP
+        host = smtp(self.mail.server, self.mail.port, timeout=self.timeout)
+        host.set_debuglevel(int(self.mail.debug))
+        if self.mail.use_tls:
+            host.starttls()
+        if self.mail.username and self.mail.password:
+            host.login(self.mail.username, self.mail.password)
+        return host
+
+
+def mail_state(app):
+    """The app's Flask-Mail state, registered the first time mail is sent."""
+    if 'mail' not in app.extensions:
+        with _lock:
+            if 'mail' not in app.extensions:
+                Mail(app)
+    return app.extensions['mail']
+
+
+def send_messages(messages, timeout):
+    """Send ``messages`` over one SMTP connection."""
+    with TimedConnection(mail_state(current_app), timeout) as connection:
+        for message in messages:
+            connection.send(message)
@@ -0,0 +1,17 @@
+import threading
+from collections import Counter
+
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def incr(name, amount=1):
+    """Increment a process-local counter."""
+    with _lock:
+        _counters[name] += amount
+
+
+def snapshot():
+    """Current value of every counter."""
+    with _lock:
+        return dict(_counters)
@@ -1,18 +1,34 @@
 from flask_pymongo import PyMongo
+from bson.objectid import ObjectId
 from datetime import datetime, date
 
 mongo = PyMongo()
 
+# Stored for queries only; never sent to clients.
+INTERNAL_FIELDS = ('tenant_id', 'technologies_lc')
+
+
+def reset_mongo_client(app):
+    """Give this process its own MongoClient.
+
+    MongoClient is not fork-safe, so each gunicorn worker calls this after
+    forking instead of reusing the client created in the master.
+    """
+    mongo.init_app(app)
+
 
 def serialize_doc(doc):
     """Convert a MongoDB document to a JSON-serializable dict.
 
     Converts ObjectId _id to string 'id' and handles datetime fields.
+    INTERNAL_FIELDS are left out.
     """
     if doc is None:
         return None
     result = {}
     for key, value in doc.items():
+        if key in INTERNAL_FIELDS:
+            continue
         if key == '_id':
             result['id'] = str(value)
         elif isinstance(value, (datetime, date)):
@@ -22,6 +38,53 @@ def serialize_doc(doc):
     return result
 
 
+def technology_key(name):
+    """Case-insensitive form of a technology name, used for matching."""
+    return name.strip().lower()
+
+
+def technology_keys(names):
+    """``technologies_lc`` for a project or experience entry's technologies."""
+    return list(dict.fromkeys(technology_key(name) for name in names or [] if name))
+
+
+def parse_object_ids(ids):
+    """Split id strings into (ObjectIds, invalid strings), keeping order."""
+    valid, invalid = [], []
+    for raw in ids:
+        if isinstance(raw, str) and ObjectId.is_valid(raw):
+            valid.append(ObjectId(raw))
+        else:
+            invalid.append(raw)
+    return valid, invalid
+
+
+def format_skill(skill):
+    """Serialize a skill, adding the proficiency alias the frontend uses."""
+    doc = serialize_doc(skill)
+    doc['proficiency'] = doc.get('level', 0)
+    return doc
+
+
+def format_project(project):
+    """Serialize a project with created_date and list fields filled in."""
+    doc = serialize_doc(project)
+    if doc.get('created_at'):
+        doc['created_date'] = doc['created_at']
+    doc.setdefault('technologies', [])
+    doc.setdefault('images', [])
+    return doc
+
+
+def format_experience(exp):
+    """Serialize an experience entry with its human-readable duration."""
+    doc = serialize_doc(exp)
+    doc['duration'] = calculate_duration(exp.get('start_date'), exp.get('end_date'))
+    doc.setdefault('technologies', [])
+    doc.setdefault('achievements', [])
+    return doc
+
+
 def calculate_duration(start_date, end_date=None):
     """Calculate human-readable duration between two dates.
 
@@ -156,6 +156,16 @@ else
     echo "  Run: python setup_database.py"
     ((FAILED++))
 fi
+
+echo -e "${YELLOW}💡 Checking cold-start budget...${NC}"
+if python profile_startup.py -n 3 > /dev/null 2>&1; then
+    echo -e "${GREEN}✅ Startup within budget${NC}"
+    ((PASSED++))
+else
+    echo -e "${RED}❌ Startup over budget or loads deferred modules${NC}"
+    echo "  Run: python profile_startup.py"
+    ((FAILED++))
+fi
 echo ""
 
 echo -e "${BLUE}5. Checking Git Repository${NC}"
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Startup Profiler
+Measures a cold start in fresh interpreters: per-module import cost (from
+python -X importtime) and the time from process start to the first byte
+of the first response, served in-process by the Flask test client:
+
+    python profile_startup.py                   # GET /, seeding deferred
+    python profile_startup.py -p /api/projects  # a route that reads MongoDB
+    python profile_startup.py --with-startup    # include init_app() seeding
+
+Exits non-zero if a module in DEFERRED_MODULES is imported by `import app`
+or if the median time to first byte exceeds --budget-ms, so it can guard
+against startup regressions before a deploy.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Imported on first use only; `import app` must not pull these in.
+DEFERRED_MODULES = (
+    'flask_mail', 'mailer', 'smtplib', 'emails', 'init_db', 'seed', 'thumbnails', 'PIL',
+    'technology_usage', 'search', 'asyncio', 'aiosmtplib', 'motor',
+)
+# Milliseconds from process start to the first response byte.
+STARTUP_BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 1500))
+
+CHILD = """
+import json, logging, os, sys, time
+started = float(os.environ['PROFILE_SPAWNED_AT'])
+interpreter_ready = time.time()
+import app
+imported = time.time()
+# Sampled access lines share stdout with the result below.
+logging.getLogger('portfolio.access').disabled = True
+modules = sorted(sys.modules)
+response = app.app.test_client().get(sys.argv[1], buffered=False)
+next(iter(response.response), b'')
+first_byte = time.time()
+print(json.dumps({
+    'interpreter_ms': (interpreter_ready - started) * 1000,
+    'import_ms': (imported - interpreter_ready) * 1000,
+    'request_ms': (first_byte - imported) * 1000,
+    'ttfb_ms': (first_byte - started) * 1000,
+    'status': response.status_code,
+    'modules': modules,
+}))
+"""
+
+
+def child_env(with_startup):
+    env = dict(os.environ)
+    # Profiling requests aren't visitors
+    env['ANALYTICS_DISABLED'] = '1'
+    if not with_startup:
+        env['DEFER_STARTUP'] = '1'
+    return env
+
+
+def measure_first_byte(path, with_startup):
+    env = child_env(with_startup)
+    env['PROFILE_SPAWNED_AT'] = repr(time.time())
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD, path], cwd=HERE, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_times(with_startup):
+    """[(module, self_us, cumulative_us, depth)] for modules imported by ``import app``.
+
+    Modules the interpreter loads before running the command are left out.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=HERE,
+        env=child_env(with_startup), capture_output=True, text=True, check=True
+    )
+    rows = []
+    last_top_level = -1
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+        # -X importtime lists a module after everything it imported.
+        if depth == 0 and name.strip() == 'app':
+            return rows[last_top_level + 1:]
+        if depth == 0:
+            last_top_level = len(rows) - 1
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a cold start of the API")
+    parser.add_argument('-p', '--path', default='/', help="first request (default /)")
+    parser.add_argument('-n', '--runs', type=int, default=5, help="cold starts to time (default 5)")
+    parser.add_argument('--top', type=int, default=15, help="modules to list (default 15)")
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                        help=f"fail above this median time to first byte (default {STARTUP_BUDGET_MS:g})")
+    parser.add_argument('--with-startup', action='store_true',
+                        help="run init_app() on import, as a non-gunicorn start does (needs MongoDB)")
+    args = parser.parse_args()
+
+    # The first run warms the OS file cache and .pyc files; don't count it.
+    runs = [measure_first_byte(args.path, args.with_startup) for _ in range(args.runs + 1)][1:]
+    imports = import_times(args.with_startup)
+
+    print(f"Cold start, GET {args.path} (median of {args.runs}, status {runs[-1]['status']})")
+    print("=" * 50)
+    for key, label in (('interpreter_ms', 'interpreter start'), ('import_ms', 'import app'),
+                       ('request_ms', 'first request'), ('ttfb_ms', 'time to first byte')):
+        print(f"  {label:<22} {statistics.median(r[key] for r in runs):8.1f} ms")
+
+    top_level = [row for row in imports if row[3] == 1]
+    # A dependency shared by several modules is charged to the first to import it.
+    print("\nImports by cumulative cost (direct imports of app)")
+    for name, _, cumulative, _ in sorted(top_level, key=lambda r: -r[2])[:args.top]:
+        print(f"  {name:<40} {cumulative / 1000:8.1f} ms")
+    print("\nModules by self cost")
+    for name, self_us, _, _ in sorted(imports, key=lambda r: -r[1])[:args.top]:
+        print(f"  {name:<40} {self_us / 1000:8.1f} ms")
+
+    failures = []
+    loaded = set(runs[-1]['modules'])
+    eager = [m for m in DEFERRED_MODULES if m in loaded]
+    if eager:
+        failures.append(f"imported at startup but should be deferred: {', '.join(eager)}")
+    ttfb = statistics.median(r['ttfb_ms'] for r in runs)
+    if ttfb > args.budget_ms:
+        failures.append(f"time to first byte {ttfb:.0f} ms is over the {args.budget_ms:g} ms budget")
+
+    print()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: {ttfb:.0f} ms to first byte (budget {args.budget_ms:g} ms), no deferred modules loaded")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""
+On-demand profiling for a running worker.
+
+Disabled unless PROFILING_TOKEN is set; when disabled no hooks or routes
+are registered, so there is no per-request cost. Every endpoint requires
+the token in the X-Profile-Token header.
+
+    POST /api/admin/profile/cpu?seconds=10        sample all in-flight requests
+    GET  /api/admin/profile/requests/<profile_id> profile of one request
+    POST /api/admin/profile/memory                tracemalloc snapshot + diff
+    DELETE /api/admin/profile/memory              stop tracemalloc
+
+A single request is profiled by sending ``X-Profile: 1`` along with the
+token; the response carries an X-Profile-ID to fetch the result with.
+CPU profiles are collapsed stacks ("frame;frame;frame count" per line),
+which flamegraph.pl and speedscope read directly.
+
+Profiles and snapshots are per worker process; every response includes
+the pid that produced it.
+"""
+
+import hmac
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from flask import Response, g, jsonify, request
+
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+# Upper bound for a time-bounded CPU profile (seconds).
+PROFILE_MAX_SECONDS = int(os.environ.get('PROFILE_MAX_SECONDS', 60))
+# Shortest time-bounded CPU profile (seconds).
+PROFILE_MIN_SECONDS = 0.1
+# Seconds between stack samples.
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', 0.005))
+# Shortest interval a profile may ask for.
+PROFILE_MIN_INTERVAL = 0.001
+# Frames recorded per allocation once tracemalloc is started.
+TRACEMALLOC_FRAMES = int(os.environ.get('TRACEMALLOC_FRAMES', 10))
+# Single-request profiles kept for retrieval.
+KEPT_REQUEST_PROFILES = 50
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = os.path.relpath(filename, _ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame):
+    """Root-to-leaf frame labels joined with ';'."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def format_collapsed(stacks):
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class StackSampler:
+    """Background thread sampling the stacks of selected threads.
+
+    ``thread_ids`` is either a fixed set of thread idents or a callable
+    returning the idents to sample at each tick.
+    """
+
+    def __init__(self, thread_ids, interval=PROFILE_INTERVAL):
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            targets = self.thread_ids() if callable(self.thread_ids) else self.thread_ids
+            if not targets:
+                continue
+            frames = sys._current_frames()
+            for ident in targets:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[collapse_stack(frame)] += 1
+                    self.samples += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+# Threads currently inside a request, for the time-bounded profile.
+_active_threads = set()
+_active_lock = threading.Lock()
+
+_request_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+_last_snapshot = None
+_last_snapshot_at = None
+_snapshot_lock = threading.Lock()
+
+
+def _active_request_threads():
+    with _active_lock:
+        return set(_active_threads)
+
+
+def _authorized():
+    token = request.headers.get('X-Profile-Token', '')
+    return hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode())
+
+
+def _forbidden():
+    return jsonify({"error": "Forbidden"}), 403
+
+
+def _before_request():
+    with _active_lock:
+        _active_threads.add(threading.get_ident())
+    if request.headers.get('X-Profile') and _authorized():
+        g.profile_sampler = StackSampler({threading.get_ident()}, interval=PROFILE_MIN_INTERVAL).start()
+
+
+def _after_request(response):
+    sampler = g.pop('profile_sampler', None)
+    if sampler is not None:
+        profile_id = g.get('request_id') or uuid.uuid4().hex
+        stacks = sampler.stop()
+        with _profiles_lock:
+            _request_profiles[profile_id] = (request.method, request.path, stacks)
+            while len(_request_profiles) > KEPT_REQUEST_PROFILES:
+                _request_profiles.popitem(last=False)
+        response.headers['X-Profile-ID'] = profile_id
+    return response
+
+
+def _teardown_request(exc):
+    sampler = g.pop('profile_sampler', None)
+    if sampler is not None:
+        sampler.stop()
+    with _active_lock:
+        _active_threads.discard(threading.get_ident())
+
+
+def cpu_profile():
+    """Sample every in-flight request for ``seconds`` and return collapsed stacks."""
+    if not _authorized():
+        return _forbidden()
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval = float(request.args.get('interval', PROFILE_INTERVAL))
+    except ValueError:
+        seconds = interval = math.nan
+    if not (math.isfinite(seconds) and math.isfinite(interval)):
+        return jsonify({"error": "seconds and interval must be numbers"}), 400
+    seconds = min(max(seconds, PROFILE_MIN_SECONDS), PROFILE_MAX_SECONDS)
+    interval = min(max(interval, PROFILE_MIN_INTERVAL), seconds)
+
+    # Leave out this request's own thread, which only sleeps.
+    own = threading.get_ident()
+    sampler = StackSampler(lambda: _active_request_threads() - {own}, interval=interval).start()
+    try:
+        time.sleep(seconds)
+    finally:
+        sampler.stop()
+    response = Response(format_collapsed(sampler.stacks), mimetype='text/plain')
+    response.headers['X-Profile-Samples'] = str(sampler.samples)
+    response.headers['X-Profile-PID'] = str(os.getpid())
+    return response
+
+
+def request_profile(profile_id):
+    """Collapsed stacks recorded for a request sent with X-Profile."""
+    if not _authorized():
+        return _forbidden()
+    with _profiles_lock:
+        entry = _request_profiles.get(profile_id)
+    if entry is None:
+        return jsonify({"error": "Profile not found", "pid": os.getpid()}), 404
+    method, path, stacks = entry
+    response = Response(format_collapsed(stacks), mimetype='text/plain')
+    response.headers['X-Profile-Request'] = f"{method} {path}"
+    response.headers['X-Profile-PID'] = str(os.getpid())
+    return response
+
+
+def _stat_entry(stat, group_by):
+    frames = stat.traceback if group_by == 'traceback' else stat.traceback[:1]
+    entry = {
+        'location': [f"{frame.filename}:{frame.lineno}" for frame in frames],
+        'size': stat.size,
+        'count': stat.count,
+    }
+    if hasattr(stat, 'size_diff'):
+        entry['size_diff'] = stat.size_diff
+        entry['count_diff'] = stat.count_diff
+    return entry
+
+
+def memory_snapshot():
+    """Take a tracemalloc snapshot and diff it against the previous one.
+
+    The first call starts tracing; allocations made before that are not
+    seen, so call it once, exercise the suspect code, then call again.
+    """
+    global _last_snapshot, _last_snapshot_at
+    if not _authorized():
+        return _forbidden()
+    group_by = request.args.get('group_by', 'lineno')
+    if group_by not in ('lineno', 'filename', 'traceback'):
+        return jsonify({"error": "group_by must be lineno, filename or traceback"}), 400
+    try:
+        limit = int(request.args.get('limit', 25))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    started = False
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        started = True
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ))
+    with _snapshot_lock:
+        previous, previous_at = _last_snapshot, _last_snapshot_at
+        _last_snapshot, _last_snapshot_at = snapshot, datetime.utcnow()
+
+    if previous is not None:
+        stats = snapshot.compare_to(previous, group_by)
+    else:
+        stats = snapshot.statistics(group_by)
+
+    current, peak = tracemalloc.get_traced_memory()
+    return jsonify({
+        'pid': os.getpid(),
+        'started': started,
+        'traced_current': current,
+        'traced_peak': peak,
+        'compared_to': previous_at.isoformat() if previous_at else None,
+        'top': [_stat_entry(stat, group_by) for stat in stats[:limit]],
+    })
+
+
+def stop_memory_tracing():
+    global _last_snapshot, _last_snapshot_at
+    if not _authorized():
+        return _forbidden()
+    tracemalloc.stop()
+    with _snapshot_lock:
+        _last_snapshot = _last_snapshot_at = None
+    return jsonify({'pid': os.getpid(), 'tracing': False})
+
+
+def init_profiling(app):
+    """Register the profiling hooks and routes if PROFILING_TOKEN is set."""
+    if not PROFILING_TOKEN:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/api/admin/profile/cpu', 'cpu_profile', cpu_profile, methods=['POST'])
+    app.add_url_rule('/api/admin/profile/requests/<profile_id>', 'request_profile', request_profile)
+    app.add_url_rule('/api/admin/profile/memory', 'memory_snapshot', memory_snapshot, methods=['POST'])
+    app.add_url_rule('/api/admin/profile/memory', 'stop_memory_tracing', stop_memory_tracing,
+                     methods=['DELETE'])
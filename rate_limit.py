@@ -0,0 +1,174 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import jsonify, request
+from pymongo import ReturnDocument
+
+import metrics
+from models import mongo
+
+# Contact form limits: sustained rate per hour and burst size.
+CONTACT_IP_PER_HOUR = float(os.environ.get('CONTACT_IP_PER_HOUR', 5))
+CONTACT_IP_BURST = int(os.environ.get('CONTACT_IP_BURST', 3))
+CONTACT_GLOBAL_PER_HOUR = float(os.environ.get('CONTACT_GLOBAL_PER_HOUR', 100))
+CONTACT_GLOBAL_BURST = int(os.environ.get('CONTACT_GLOBAL_BURST', 20))
+# Confirmation emails per recipient address per hour.
+CONFIRMATION_PER_HOUR = float(os.environ.get('CONFIRMATION_PER_HOUR', 1))
+
+# Reverse proxies in front of the app that append to X-Forwarded-For
+# (Render has one); 0 ignores the header.
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 1))
+
+# 'memory' keeps buckets in this process; 'mongo' shares counters across workers.
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+
+# Most distinct keys (e.g. client IPs) tracked in memory at once.
+MAX_TRACKED_KEYS = 10000
+
+
+class TokenBucket:
+    def __init__(self, capacity, refill_per_second):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Consume one token. Returns 0 if allowed, else seconds to wait."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.refill_per_second
+
+
+class MemoryRateLimiter:
+    """Token buckets per key, held in process memory."""
+
+    def __init__(self, per_hour, burst, max_keys=MAX_TRACKED_KEYS):
+        self.per_hour = per_hour
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.burst, self.per_hour / 3600)
+                self._buckets[key] = bucket
+                # Evicted keys simply start again with a full bucket.
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take()
+
+
+class MongoRateLimiter:
+    """Fixed-window counters in MongoDB, shared by every worker.
+
+    Each window allows ``burst`` requests and lasts burst / rate hours.
+    Counter documents expire through a TTL index on ``expires_at``.
+    """
+
+    collection_name = 'rate_limits'
+
+    def __init__(self, per_hour, burst):
+        self.per_hour = per_hour
+        self.burst = burst
+        self.window = max(1, int(3600 * burst / per_hour))
+        self._indexed = False
+
+    def hit(self, key):
+        collection = mongo.db[self.collection_name]
+        if not self._indexed:
+            collection.create_index('expires_at', expireAfterSeconds=0)
+            self._indexed = True
+        now = time.time()
+        window_start = int(now // self.window) * self.window
+        doc = collection.find_one_and_update(
+            {'_id': f"{key}:{window_start}"},
+            {'$inc': {'count': 1},
+             '$setOnInsert': {'expires_at': datetime.utcnow() + timedelta(seconds=self.window)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc['count'] <= self.burst:
+            return 0
+        return window_start + self.window - now
+
+
+def _limiter(per_hour, burst):
+    if RATE_LIMIT_BACKEND == 'mongo':
+        return MongoRateLimiter(per_hour, burst)
+    return MemoryRateLimiter(per_hour, burst)
+
+
+contact_ip_limiter = _limiter(CONTACT_IP_PER_HOUR, CONTACT_IP_BURST)
+contact_global_limiter = _limiter(CONTACT_GLOBAL_PER_HOUR, CONTACT_GLOBAL_BURST)
+confirmation_limiter = _limiter(CONFIRMATION_PER_HOUR, 1)
+
+
+def client_ip(headers, remote_addr):
+    """Address our proxies saw the request come from, else the peer.
+
+    Each trusted proxy appends the address it received the request from to
+    X-Forwarded-For; anything to the left of those is set by the client
+    and can't be trusted.
+    """
+    forwarded = [a.strip() for a in headers.get('X-Forwarded-For', '').split(',') if a.strip()]
+    if TRUSTED_PROXIES and len(forwarded) >= TRUSTED_PROXIES:
+        return forwarded[-TRUSTED_PROXIES]
+    return remote_addr or 'unknown'
+
+
+def check_contact_limits(ip):
+    """Seconds the client must wait, or 0 if the contact request may proceed."""
+    retry_after = contact_ip_limiter.hit(f"contact:ip:{ip}")
+    if retry_after:
+        metrics.incr('contact_rate_limited_ip')
+        return retry_after
+    retry_after = contact_global_limiter.hit('contact:global')
+    if retry_after:
+        metrics.incr('contact_rate_limited_global')
+        return retry_after
+    metrics.incr('contact_allowed')
+    return 0
+
+
+def allow_confirmation(email):
+    """Whether a confirmation email may be sent to ``email`` right now.
+
+    Keeps the contact form from being used to flood a third party's inbox.
+    """
+    if confirmation_limiter.hit(f"confirmation:{email.lower()}"):
+        metrics.incr('contact_confirmation_suppressed')
+        return False
+    return True
+
+
+def too_many_requests(retry_after):
+    response = jsonify({"error": "Too many requests. Please try again later."})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+def contact_rate_limit(view):
+    """Reject over-limit contact requests before any database or mail work."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        retry_after = check_contact_limits(client_ip(request.headers, request.remote_addr))
+        if retry_after:
+            return too_many_requests(retry_after)
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,374 @@
+"""
+Data access for the content and contact collections.
+
+Each collection has a repository that owns its filters, projections and
+sort order; routes call these instead of using ``mongo.db`` directly.
+Reads are described as ``Read`` specs (the ``*_read`` methods) and run
+with PyMongo by the repository, or with Motor by ``run_async`` for
+asgi.py, so both apps send the same queries. Every call is recorded in
+the QueryStats active for the current context (see ``track_queries``) as
+one round trip plus the documents it returned, which is how
+check_query_budgets.py holds each endpoint to a budget.
+
+Collections with their own modules keep their queries there: versioning
+(delta sync), analytics, spam fingerprints, technology_usage and retention.
+"""
+
+import contextvars
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+from models import mongo, technology_key
+from tenancy import scoped
+
+_stats = contextvars.ContextVar('query_stats', default=None)
+
+
+class QueryStats:
+    """Round trips and documents read by repository calls."""
+
+    def __init__(self):
+        self.round_trips = 0
+        self.documents = 0
+        self.calls = []
+
+    def record(self, call, documents):
+        self.round_trips += 1
+        self.documents += documents
+        self.calls.append(call)
+
+
+@contextmanager
+def track_queries():
+    """Collect QueryStats for repository calls made inside the block."""
+    stats = QueryStats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+def _record(call, documents=0):
+    stats = _stats.get()
+    if stats is not None:
+        stats.record(call, documents)
+
+
+# ---------- Query builders (shared with asgi.py) ----------
+#
+# Each returns a filter already scoped to the current tenant.
+
+def projects_query(args):
+    query = {}
+    if args.get('featured', 'false').lower() == 'true':
+        query['featured'] = True
+    technology = args.get('technology', '').strip()
+    if technology:
+        # Case-insensitive, served by the multikey index on projects.technologies_lc
+        query['technologies_lc'] = technology_key(technology)
+    return scoped(query)
+
+
+def experience_query(args):
+    query = {}
+    technology = args.get('technology', '').strip()
+    if technology:
+        # Case-insensitive, served by the multikey index on experience.technologies_lc
+        query['technologies_lc'] = technology_key(technology)
+    return scoped(query)
+
+
+CONTACT_FLAGS = ('is_read', 'is_replied', 'is_spam')
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ('true', '1', 'yes'):
+        return True
+    if str(value).lower() in ('false', '0', 'no'):
+        return False
+    raise ValueError(f"Invalid boolean: {value!r}")
+
+
+def _string(spec, field):
+    """``spec[field]`` if given; JSON filters could otherwise pass operators like {"$ne": null}."""
+    value = spec.get(field)
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value
+
+
+def contacts_query(spec):
+    """Mongo filter for admin contact queries.
+
+    Accepts is_read / is_replied / is_spam, email, and created_after /
+    created_before (ISO dates). Raises ValueError on bad input.
+    """
+    query = {}
+    for flag in CONTACT_FLAGS:
+        if spec.get(flag) not in (None, ''):
+            query[flag] = _parse_bool(spec[flag])
+    email = _string(spec, 'email')
+    if email:
+        query['email'] = email
+    created = {}
+    created_after = _string(spec, 'created_after')
+    if created_after:
+        created['$gte'] = datetime.fromisoformat(created_after)
+    created_before = _string(spec, 'created_before')
+    if created_before:
+        created['$lt'] = datetime.fromisoformat(created_before)
+    if created:
+        query['created_at'] = created
+    return scoped(query)
+
+
+# ---------- Reads ----------
+
+# One query: ``op`` is find, find_one, count_documents or distinct (of ``field``).
+Read = namedtuple('Read', 'collection op filter projection sort field', defaults=(None, None, None))
+
+
+def _documents(read, result):
+    if read.op in ('find', 'distinct'):
+        return len(result)
+    if read.op == 'find_one':
+        return int(result is not None)
+    return 0
+
+
+def run(read, db=None):
+    """Run ``read`` with PyMongo."""
+    coll = (db if db is not None else mongo.db)[read.collection]
+    if read.op == 'find':
+        cursor = coll.find(read.filter, read.projection)
+        if read.sort:
+            cursor = cursor.sort(*read.sort)
+        result = list(cursor)
+    elif read.op == 'find_one':
+        result = coll.find_one(read.filter, read.projection)
+    elif read.op == 'count_documents':
+        result = coll.count_documents(read.filter)
+    else:
+        result = coll.distinct(read.field, read.filter)
+    _record(f'{read.collection}.{read.op}', _documents(read, result))
+    return result
+
+
+async def run_async(read, db):
+    """Run ``read`` on a Motor database."""
+    coll = db[read.collection]
+    if read.op == 'find':
+        cursor = coll.find(read.filter, read.projection)
+        if read.sort:
+            cursor = cursor.sort(*read.sort)
+        result = await cursor.to_list(None)
+    elif read.op == 'find_one':
+        result = await coll.find_one(read.filter, read.projection)
+    elif read.op == 'count_documents':
+        result = await coll.count_documents(read.filter)
+    else:
+        result = await coll.distinct(read.field, read.filter)
+    _record(f'{read.collection}.{read.op}', _documents(read, result))
+    return result
+
+
+# ---------- Repositories ----------
+
+class Repository:
+    collection = None
+    # (field, direction) for lists, or None for natural order.
+    sort = None
+    # tenant_id is never returned to clients, so don't fetch it.
+    projection = {'tenant_id': 0}
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def coll(self):
+        return (self._db if self._db is not None else mongo.db)[self.collection]
+
+    def _run(self, read):
+        return run(read, self._db)
+
+    def _find_read(self, query, projection=None, sort=None):
+        return Read(self.collection, 'find', query, projection or self.projection, sort or self.sort)
+
+    def _find_one_read(self, query, projection=None):
+        return Read(self.collection, 'find_one', query, projection or self.projection)
+
+    def _count_read(self, query):
+        return Read(self.collection, 'count_documents', query)
+
+    def all_read(self, tenant_id=None, projection=None):
+        return self._find_read(scoped(tenant_id=tenant_id), projection)
+
+    def all(self, tenant_id=None, projection=None):
+        """Every document of the current (or given) tenant."""
+        return self._run(self.all_read(tenant_id, projection))
+
+
+class DeveloperRepository(Repository):
+    collection = 'developer'
+
+    def get_read(self, projection=None):
+        return self._find_one_read(scoped(), projection)
+
+    def get(self, projection=None):
+        return self._run(self.get_read(projection))
+
+
+class ProjectRepository(Repository):
+    collection = 'projects'
+    sort = ('created_at', -1)
+
+    def list_read(self, args):
+        return self._find_read(projects_query(args))
+
+    def by_ids_read(self, ids):
+        return self._find_read(scoped({'_id': {'$in': ids}}))
+
+    def get_read(self, project_id):
+        return self._find_one_read(scoped({'_id': project_id}))
+
+    def count_read(self):
+        return self._count_read(scoped())
+
+    def list(self, args):
+        return self._run(self.list_read(args))
+
+    def by_ids(self, ids):
+        return self._run(self.by_ids_read(ids))
+
+    def get(self, project_id):
+        return self._run(self.get_read(project_id))
+
+    def count(self):
+        return self._run(self.count_read())
+
+
+class ExperienceRepository(Repository):
+    collection = 'experience'
+    sort = ('start_date', -1)
+
+    def list_read(self, args):
+        return self._find_read(experience_query(args))
+
+    def list(self, args):
+        return self._run(self.list_read(args))
+
+
+class EducationRepository(Repository):
+    collection = 'education'
+    sort = ('start_date', -1)
+
+
+class CertificationRepository(Repository):
+    collection = 'certifications'
+
+
+class AchievementRepository(Repository):
+    collection = 'achievements'
+
+
+class TechnologyRepository(Repository):
+    collection = 'technologies'
+    sort = ('name', 1)
+
+
+class SkillRepository(Repository):
+    # Unsorted: SkillsView orders by level itself, keeping stored order for ties.
+    collection = 'skills'
+
+    def distinct_names_read(self):
+        return Read(self.collection, 'distinct', scoped(), field='name')
+
+    def distinct_names(self):
+        return self._run(self.distinct_names_read())
+
+
+class SiteSettingsRepository(Repository):
+    collection = 'site_settings'
+
+    def values_read(self, keys):
+        return self._find_read(scoped({'key': {'$in': list(keys)}}), {'_id': 0, 'key': 1, 'value': 1})
+
+    @staticmethod
+    def by_key(docs):
+        return {doc['key']: doc for doc in docs}
+
+    def values(self, keys):
+        """{key: document} for the given setting keys, in one query."""
+        return self.by_key(self._run(self.values_read(keys)))
+
+
+class ContactRepository(Repository):
+    collection = 'contacts'
+    sort = ('created_at', -1)
+
+    def list(self, query):
+        return self._run(self._find_read(query))
+
+    def cursor(self, query, batch_size):
+        """Unmaterialized cursor for streaming; documents are not counted."""
+        _record('contacts.find')
+        return self.coll.find(query, self.projection).sort(*self.sort).batch_size(batch_size)
+
+    def unread_count(self):
+        # Counted from the {is_read, created_at} index, no documents loaded
+        return self._run(self._count_read(scoped({'is_read': False})))
+
+    def insert(self, doc):
+        self.coll.insert_one(doc)
+        _record('contacts.insert_one')
+
+    def mark_read(self, contact_id, expire_at, fields):
+        """Set is_read plus ``fields`` on one contact; returns whether it exists.
+
+        ``expire_at`` only applies if the contact wouldn't expire sooner.
+        """
+        result = self.coll.update_one(
+            scoped({'_id': contact_id}),
+            {'$set': {'is_read': True, **fields}, '$min': {'expire_at': expire_at}}
+        )
+        _record('contacts.update_one')
+        return result.matched_count > 0
+
+    def update_many(self, query, update):
+        result = self.coll.update_many(query, update)
+        _record('contacts.update_many')
+        return result
+
+    def delete_many(self, query, version, tenant_id=None):
+        """Delete matching contacts at ``version``; returns (deleted ids, count).
+
+        Matches are tagged with the version first, so the ids returned for
+        tombstones are exactly the documents the filter matched, including
+        any inserted since the request began.
+        """
+        self.coll.update_many(query, {'$set': {'deleted_version': version}})
+        _record('contacts.update_many')
+        tagged = scoped({'deleted_version': version}, tenant_id)
+        ids = self.coll.distinct('_id', tagged)
+        _record('contacts.distinct', len(ids))
+        result = self.coll.delete_many(tagged)
+        _record('contacts.delete_many')
+        return ids, result.deleted_count
+
+
+developer = DeveloperRepository()
+projects = ProjectRepository()
+experience = ExperienceRepository()
+education = EducationRepository()
+certifications = CertificationRepository()
+achievements = AchievementRepository()
+technologies = TechnologyRepository()
+skills = SkillRepository()
+site_settings = SiteSettingsRepository()
+contacts = ContactRepository()
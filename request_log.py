@@ -0,0 +1,194 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, request
+from pymongo import monitoring
+
+import metrics
+from tenancy import current_tenant
+
+# Fraction of successful, fast requests that get an access log line.
+ACCESS_LOG_SAMPLE_RATE = float(os.environ.get('ACCESS_LOG_SAMPLE_RATE', 0.1))
+# Requests slower than this are always logged.
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+# Records waiting to be written; beyond this they are dropped, not blocked on.
+LOG_QUEUE_SIZE = 10000
+
+logger = logging.getLogger('portfolio')
+access_logger = logging.getLogger('portfolio.access')
+
+# Per-request counters, visible to the Mongo command listener.
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of raising when the queue is full."""
+
+    def prepare(self, record):
+        """Copy ``record`` for the queue with its traceback already formatted.
+
+        The stock prepare() appends the traceback to ``msg`` and clears it,
+        which would leave the formatter's ``exc`` field empty.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        # Frames stay alive while a traceback sits in the queue.
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr('log_records_dropped')
+
+
+class MongoOpCounter(monitoring.CommandListener):
+    """Counts MongoDB commands issued while handling the current request."""
+
+    def started(self, event):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats['mongo_ops'] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# Must be registered before any MongoClient is created.
+monitoring.register(MongoOpCounter())
+
+_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener():
+    """Start the background writer in this process (again, after a fork)."""
+    global _listener, _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        _handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter())
+        _listener = QueueListener(_handler.queue, stream, respect_handler_level=False)
+        _listener.start()
+        _listener_pid = os.getpid()
+
+
+def _stop_listener():
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
+
+logger.addHandler(_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+def new_request_id(incoming=None):
+    """The client's X-Request-ID, or a new one."""
+    return incoming or uuid.uuid4().hex
+
+
+def track_request():
+    """Start counting MongoDB commands in this context; returns a token for reset_request()."""
+    return _request_stats.set({'mongo_ops': 0})
+
+
+def reset_request(token):
+    _request_stats.reset(token)
+
+
+def log_access(request_id, tenant, method, route, path, status, latency_ms, cache=None):
+    """Log one request: always on errors and slow requests, else a sample.
+
+    Shared by the Flask hooks below and asgi.py's native handlers.
+    """
+    if status >= 400 or latency_ms >= SLOW_REQUEST_MS or random.random() < ACCESS_LOG_SAMPLE_RATE:
+        stats = _request_stats.get() or {}
+        level = logging.ERROR if status >= 500 else logging.WARNING if status >= 400 else logging.INFO
+        access_logger.log(level, 'request', extra={'fields': {
+            'request_id': request_id,
+            'tenant': tenant,
+            'method': method,
+            'route': route,
+            'path': path,
+            'status': status,
+            'latency_ms': round(latency_ms, 2),
+            'mongo_ops': stats.get('mongo_ops', 0),
+            'cache': cache,
+            'slow': latency_ms >= SLOW_REQUEST_MS,
+        }})
+
+
+def _before_request():
+    ensure_listener()
+    g.request_id = new_request_id(request.headers.get('X-Request-ID'))
+    g.request_started = time.perf_counter()
+    g.request_stats_token = track_request()
+
+
+def _after_request(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    response.headers['X-Request-ID'] = g.request_id
+    log_access(
+        g.request_id, current_tenant(), request.method,
+        request.url_rule.rule if request.url_rule else None, request.path, response.status_code,
+        (time.perf_counter() - started) * 1000, response.headers.get('X-Cache'),
+    )
+    return response
+
+
+def _teardown_request(exc):
+    token = g.pop('request_stats_token', None)
+    if token is not None:
+        reset_request(token)
+
+
+def init_request_logging(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
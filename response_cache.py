@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import make_response, request
+
+import metrics
+from tenancy import current_tenant
+
+# Seconds a cached public response stays fresh.
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 512))
+
+
+class ResponseCache:
+    """LRU of rendered GET responses keyed by tenant, path and query string."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, ttl, body, status, mimetype):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, body, status, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, tenant_id=None):
+        """Drop every entry, or only those of one tenant."""
+        with self._lock:
+            if tenant_id is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == tenant_id]:
+                del self._entries[key]
+
+
+response_cache = ResponseCache()
+
+
+def cached(ttl=None):
+    """Serve successful GET responses of a view from the shared cache.
+
+    Compression happens later in the after_request hook, which keeps its
+    own compressed copy per body, so a hit costs no JSON encoding and no
+    compression.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            key = (current_tenant(), request.full_path)
+            entry = response_cache.get(key)
+            if entry is not None:
+                metrics.incr('response_cache_hit')
+                _, body, status, mimetype = entry
+                response = make_response(body, status)
+                response.mimetype = mimetype
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            metrics.incr('response_cache_miss')
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                response_cache.set(
+                    key, ttl or RESPONSE_CACHE_TTL,
+                    response.get_data(), response.status_code, response.mimetype
+                )
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Contact Retention and Archival
+
+Spam and read messages carry an ``expire_at`` date. expire_contacts()
+deletes them once it has passed, leaving tombstones so delta sync and the
+admin stream report the deletion; it runs before each contacts delta and
+stream poll. A TTL index removes them CONTACT_EXPIRY_GRACE_DAYS later as
+a backstop. Older messages can be archived to gzipped NDJSON before they
+expire and re-imported later:
+
+    python retention.py archive [--older-than DAYS] [--batch-size N]
+    python retention.py import FILE [FILE ...]
+"""
+
+import gzip
+import os
+from datetime import datetime, timedelta
+
+from bson import json_util
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from models import mongo
+from repositories import ContactRepository
+from tenancy import current_tenant, scoped
+from versioning import VERSIONS_COLLECTION, raise_floor, record_deletes, versioned_write
+
+SPAM_RETENTION_DAYS = int(os.environ.get('CONTACT_SPAM_RETENTION_DAYS', 30))
+READ_RETENTION_DAYS = int(os.environ.get('CONTACT_READ_RETENTION_DAYS', 365))
+ARCHIVE_AFTER_DAYS = int(os.environ.get('CONTACT_ARCHIVE_AFTER_DAYS', 90))
+ARCHIVE_DIR = os.environ.get(
+    'CONTACT_ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archives')
+)
+ARCHIVE_BATCH_SIZE = 500
+# Days past expire_at before the TTL index deletes a contact that
+# expire_contacts() hasn't.
+EXPIRY_GRACE_DAYS = int(os.environ.get('CONTACT_EXPIRY_GRACE_DAYS', 7))
+# How often a tenant's last expiry sweep is written back.
+SWEEP_RECORD_INTERVAL = timedelta(hours=1)
+
+RETENTION_INDEX = IndexModel([('expire_at', ASCENDING)], expireAfterSeconds=EXPIRY_GRACE_DAYS * 86400)
+
+
+def spam_expiry(created_at):
+    return created_at + timedelta(days=SPAM_RETENTION_DAYS)
+
+
+def read_expiry():
+    return datetime.utcnow() + timedelta(days=READ_RETENTION_DAYS)
+
+
+def apply_retention(contact_doc):
+    """Set expire_at on a new contact if it is spam."""
+    if contact_doc.get('is_spam'):
+        contact_doc['expire_at'] = spam_expiry(contact_doc['created_at'])
+    return contact_doc
+
+
+def ensure_retention_index(db):
+    try:
+        db.contacts.create_indexes([RETENTION_INDEX])
+    except OperationFailure as e:
+        # 85: IndexOptionsConflict, from a different grace period
+        if e.code != 85:
+            raise
+        db.command('collMod', 'contacts', index={
+            'keyPattern': RETENTION_INDEX.document['key'],
+            'expireAfterSeconds': RETENTION_INDEX.document['expireAfterSeconds'],
+        })
+
+
+def delete_contacts(db, tenant_id, query):
+    """Delete one tenant's contacts matching ``query``, with tombstones."""
+    with versioned_write(db, tenant_id) as version:
+        ids, deleted = ContactRepository(db).delete_many(scoped(query, tenant_id), version, tenant_id)
+        record_deletes(db, 'contacts', ids, version, tenant_id)
+    return deleted
+
+
+def expire_contacts(db, tenant_id=None):
+    """Delete the tenant's contacts past expire_at; returns how many.
+
+    If this hasn't run for EXPIRY_GRACE_DAYS, the TTL index may have
+    removed contacts without tombstones, so the floor is raised and delta
+    clients resync in full.
+    """
+    tenant_id = tenant_id or current_tenant()
+    now = datetime.utcnow()
+    query = {'expire_at': {'$lte': now}}
+    deleted = 0
+    if db.contacts.find_one(scoped(query, tenant_id), {'_id': 1}):
+        deleted = delete_contacts(db, tenant_id, query)
+
+    state = db[VERSIONS_COLLECTION].find_one({'_id': tenant_id}, {'swept_at': 1})
+    swept_at = (state or {}).get('swept_at')
+    if swept_at is None or swept_at < now - timedelta(days=EXPIRY_GRACE_DAYS):
+        with versioned_write(db, tenant_id) as version:
+            raise_floor(db, version, tenant_id)
+    if swept_at is None or swept_at < now - SWEEP_RECORD_INTERVAL:
+        db[VERSIONS_COLLECTION].update_one({'_id': tenant_id}, {'$max': {'swept_at': now}}, upsert=True)
+    return deleted
+
+
+def archive_contacts(db, older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE,
+                     archive_dir=ARCHIVE_DIR):
+    """Move contacts older than the cutoff into a gzipped NDJSON file.
+
+    Streams the cursor in batches; each batch is written and flushed
+    before its documents are deleted and tombstoned, per tenant.
+    Returns (path, count).
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    query = {'created_at': {'$lt': cutoff}, 'is_spam': {'$ne': True}}
+
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"contacts-{datetime.utcnow():%Y%m%dT%H%M%S}.ndjson.gz")
+
+    def delete_batch(batch):
+        by_tenant = {}
+        for doc in batch:
+            by_tenant.setdefault(doc['tenant_id'], []).append(doc['_id'])
+        return sum(delete_contacts(db, tenant_id, {'_id': {'$in': ids}})
+                   for tenant_id, ids in by_tenant.items())
+
+    archived = 0
+    cursor = db.contacts.find(query).sort('created_at', ASCENDING).batch_size(batch_size)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        batch = []
+        for doc in cursor:
+            f.write(json_util.dumps(doc, json_options=json_util.CANONICAL_JSON_OPTIONS) + '\n')
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                f.flush()
+                archived += delete_batch(batch)
+                batch = []
+        if batch:
+            f.flush()
+            archived += delete_batch(batch)
+
+    if archived == 0:
+        os.remove(path)
+        return None, 0
+    return path, archived
+
+
+def import_archive(db, path, batch_size=ARCHIVE_BATCH_SIZE):
+    """Re-insert contacts from an archive file. Existing _ids are skipped.
+
+    Restored contacts get a new version, so delta clients pick them up.
+    """
+    imported = 0
+
+    def insert(docs):
+        try:
+            return len(db.contacts.insert_many(docs, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            return e.details.get('nInserted', 0)
+
+    def flush(docs):
+        by_tenant = {}
+        for doc in docs:
+            by_tenant.setdefault(doc['tenant_id'], []).append(doc)
+        count = 0
+        for tenant_id, tenant_docs in by_tenant.items():
+            with versioned_write(db, tenant_id) as version:
+                for doc in tenant_docs:
+                    doc['version'] = version
+                count += insert(tenant_docs)
+        return count
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        batch = []
+        for line in f:
+            if line.strip():
+                batch.append(json_util.loads(line))
+            if len(batch) >= batch_size:
+                imported += flush(batch)
+                batch = []
+        if batch:
+            imported += flush(batch)
+    return imported
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive or re-import contact messages")
+    sub = parser.add_subparsers(dest='command', required=True)
+    archive = sub.add_parser('archive')
+    archive.add_argument('--older-than', type=int, default=ARCHIVE_AFTER_DAYS)
+    archive.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+    restore = sub.add_parser('import')
+    restore.add_argument('files', nargs='+')
+    args = parser.parse_args()
+
+    from app import app
+
+    with app.app_context():
+        db = mongo.db
+        ensure_retention_index(db)
+        if args.command == 'archive':
+            path, count = archive_contacts(db, args.older_than, args.batch_size)
+            print(f"Archived {count} contacts" + (f" to {path}" if path else ""))
+        else:
+            for path in args.files:
+                print(f"Imported {import_archive(db, path)} contacts from {path}")
+
+
+if __name__ == "__main__":
+    main()
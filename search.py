@@ -0,0 +1,197 @@
+import bisect
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+
+from models import mongo
+from repositories import ExperienceRepository, ProjectRepository, SkillRepository
+from tenancy import TenantCache, current_tenant
+
+# Rebuild the in-memory index at most this often (seconds).
+SEARCH_INDEX_TTL = int(os.environ.get('SEARCH_INDEX_TTL', 300))
+
+# Relative weight of each indexed field.
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'technologies': 2.0,
+    'category': 1.5,
+    'body': 1.0,
+}
+
+# Prefix matches (type-ahead) score lower than whole-word matches.
+PREFIX_WEIGHT = 0.5
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def tokenize(text):
+    """Lowercase ``text`` and split it into search terms."""
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(t) for t in text if t)
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def _project_entry(doc):
+    return {
+        'type': 'project',
+        'id': str(doc['_id']),
+        'title': doc.get('title', ''),
+        'snippet': doc.get('description', ''),
+        'category': None,
+        'technologies': doc.get('technologies') or [],
+        'fields': {
+            'title': doc.get('title'),
+            'technologies': doc.get('technologies'),
+            'body': doc.get('description'),
+        },
+    }
+
+
+def _skill_entry(doc):
+    return {
+        'type': 'skill',
+        'id': str(doc['_id']),
+        'title': doc.get('name', ''),
+        'snippet': doc.get('category', ''),
+        'category': doc.get('category'),
+        'technologies': [],
+        'fields': {
+            'title': doc.get('name'),
+            'category': doc.get('category'),
+        },
+    }
+
+
+def _experience_entry(doc):
+    return {
+        'type': 'experience',
+        'id': str(doc['_id']),
+        'title': f"{doc.get('title', '')} at {doc.get('company', '')}",
+        'snippet': doc.get('description', ''),
+        'category': None,
+        'technologies': doc.get('technologies') or [],
+        'fields': {
+            'title': doc.get('company'),
+            'technologies': doc.get('technologies'),
+            'body': doc.get('achievements'),
+        },
+    }
+
+
+class SearchIndex:
+    """Inverted index over projects, skills and experience."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        postings = defaultdict(dict)
+        for i, entry in enumerate(entries):
+            for field, value in entry['fields'].items():
+                weight = FIELD_WEIGHTS[field]
+                for term, count in Counter(tokenize(value)).items():
+                    postings[term][i] = postings[term].get(i, 0.0) + weight * count
+        self.postings = dict(postings)
+        self.vocabulary = sorted(self.postings)
+
+    @classmethod
+    def from_db(cls, db, tenant_id=None):
+        entries = []
+        entries += [_project_entry(d) for d in ProjectRepository(db).all(
+            tenant_id, {'title': 1, 'description': 1, 'technologies': 1})]
+        entries += [_skill_entry(d) for d in SkillRepository(db).all(
+            tenant_id, {'name': 1, 'category': 1})]
+        entries += [_experience_entry(d) for d in ExperienceRepository(db).all(
+            tenant_id, {'title': 1, 'company': 1, 'description': 1, 'achievements': 1, 'technologies': 1})]
+        return cls(entries)
+
+    def _term_scores(self, term):
+        """Scores for documents matching ``term`` exactly or by prefix."""
+        scores = dict(self.postings.get(term, {}))
+        start = bisect.bisect_left(self.vocabulary, term)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(term):
+                break
+            if word == term:
+                continue
+            for i, score in self.postings[word].items():
+                scores[i] = max(scores.get(i, 0.0), score * PREFIX_WEIGHT)
+        return scores
+
+    def search(self, query, doc_type=None, limit=20):
+        terms = tokenize(query)
+        if not terms:
+            return {'total': 0, 'results': [], 'facets': _facets([])}
+
+        # Every term must match; scores add up across terms.
+        scores = None
+        for term in terms:
+            term_scores = self._term_scores(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {i: s + term_scores[i] for i, s in scores.items() if i in term_scores}
+            if not scores:
+                break
+
+        matches = list(scores or {})
+        if doc_type:
+            matches = [i for i in matches if self.entries[i]['type'] == doc_type]
+        facets = _facets([self.entries[i] for i in matches])
+
+        matches.sort(key=lambda i: (-scores[i], self.entries[i]['title']))
+        results = []
+        for i in matches[:limit]:
+            entry = self.entries[i]
+            results.append({
+                'type': entry['type'],
+                'id': entry['id'],
+                'title': entry['title'],
+                'snippet': entry['snippet'],
+                'category': entry['category'],
+                'technologies': entry['technologies'],
+                'score': round(scores[i], 3),
+            })
+        return {'total': len(matches), 'results': results, 'facets': facets}
+
+
+def _facets(entries):
+    types, categories, technologies = Counter(), Counter(), Counter()
+    for e in entries:
+        types[e['type']] += 1
+        if e['category']:
+            categories[e['category']] += 1
+        technologies.update(e['technologies'])
+    return {
+        'type': dict(types.most_common()),
+        'category': dict(categories.most_common()),
+        'technology': dict(technologies.most_common()),
+    }
+
+
+# Indexes of the most recently used tenants, each rebuilt after the TTL.
+_indexes = TenantCache(ttl=SEARCH_INDEX_TTL)
+_lock = threading.Lock()
+
+
+def get_index():
+    """Return the current tenant's index, rebuilding it when older than the TTL."""
+    tenant_id = current_tenant()
+    index = _indexes.get(tenant_id)
+    if index is not None:
+        return index
+    with _lock:
+        index = _indexes.get(tenant_id)
+        if index is None:
+            index = SearchIndex.from_db(mongo.db, tenant_id)
+            _indexes.set(tenant_id, index)
+    return index
+
+
+def invalidate(tenant_id=None):
+    """Force a rebuild on the next search, for one tenant or all of them."""
+    if tenant_id is None:
+        _indexes.clear()
+    else:
+        _indexes.pop(tenant_id)
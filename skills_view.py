@@ -0,0 +1,80 @@
+import os
+import threading
+
+from models import mongo, format_skill
+from repositories import SkillRepository
+from tenancy import TenantCache, current_tenant
+
+# Rebuild the materialized view at most this often (seconds).
+SKILLS_VIEW_TTL = int(os.environ.get('SKILLS_VIEW_TTL', 300))
+
+
+def normalize_category(category):
+    return (category or '').strip().casefold()
+
+
+class SkillsView:
+    """Skills grouped by normalized category, pre-sorted by level.
+
+    Every combination of the featured / category filters is computed up
+    front, so /api/skills and /api/skills/categories never touch MongoDB.
+    """
+
+    def __init__(self, skills):
+        # sorted() is stable, so equal levels keep their stored order.
+        ordered = sorted(skills, key=lambda s: s.get('level') or 0, reverse=True)
+        self.all = [format_skill(skill) for skill in ordered]
+        self.featured = [s for s in self.all if s.get('is_featured')]
+
+        self.by_category = {}
+        self.featured_by_category = {}
+        for skill in self.all:
+            key = normalize_category(skill.get('category'))
+            self.by_category.setdefault(key, []).append(skill)
+            if skill.get('is_featured'):
+                self.featured_by_category.setdefault(key, []).append(skill)
+
+        self.categories = sorted({s['category'] for s in self.all if s.get('category')})
+
+    @classmethod
+    def from_db(cls, db, tenant_id=None):
+        return cls(SkillRepository(db).all(tenant_id))
+
+    def select(self, featured=False, category=None):
+        key = normalize_category(category)
+        if not key or key == 'all':
+            return self.featured if featured else self.all
+        groups = self.featured_by_category if featured else self.by_category
+        return groups.get(key, [])
+
+
+# Views of the most recently used tenants, each rebuilt after the TTL.
+_views = TenantCache(ttl=SKILLS_VIEW_TTL)
+_lock = threading.Lock()
+
+
+def cached_view():
+    """The current tenant's view if it is fresh, without rebuilding it."""
+    return _views.get(current_tenant())
+
+
+def get_view():
+    """Return the current tenant's view, rebuilding it when older than the TTL."""
+    tenant_id = current_tenant()
+    view = _views.get(tenant_id)
+    if view is not None:
+        return view
+    with _lock:
+        view = _views.get(tenant_id)
+        if view is None:
+            view = SkillsView.from_db(mongo.db, tenant_id)
+            _views.set(tenant_id, view)
+    return view
+
+
+def invalidate(tenant_id=None):
+    """Force a rebuild on the next request, for one tenant or all of them."""
+    if tenant_id is None:
+        _views.clear()
+    else:
+        _views.pop(tenant_id)
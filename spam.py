@@ -0,0 +1,150 @@
+import contextvars
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+import metrics
+
+# Identical submissions within this window are treated as duplicates.
+DUPLICATE_WINDOW_SECONDS = int(os.environ.get('DUPLICATE_WINDOW_HOURS', 24)) * 3600
+# Fingerprints remembered in memory per process.
+RECENT_FINGERPRINTS = 5000
+# Messages scoring at or above this are stored as spam with no notification.
+SPAM_THRESHOLD = int(os.environ.get('SPAM_THRESHOLD', 3))
+
+FINGERPRINT_COLLECTION = 'contact_fingerprints'
+
+URL_PATTERN = re.compile(r'https?://|www\.', re.IGNORECASE)
+SPAM_WORDS = re.compile(
+    r'\b(viagra|cialis|casino|porn|crypto|bitcoin|forex|loan|seo services?|backlinks?|'
+    r'guest post|rank your (site|website)|cheap|discount|free money|click here|unsubscribe)\b',
+    re.IGNORECASE
+)
+DISPOSABLE_DOMAINS = {
+    'mailinator.com', 'guerrillamail.com', '10minutemail.com', 'tempmail.com',
+    'yopmail.com', 'trashmail.com', 'sharklasers.com', 'getnada.com',
+}
+
+
+def _normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def fingerprint(email, subject, message, tenant_id=''):
+    """Stable hash of a submission to one tenant, ignoring case and whitespace."""
+    raw = '\x1f'.join([tenant_id] + [_normalize(part) for part in (email, subject, message)])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def spam_score(name, email, subject, message):
+    """Cheap heuristic score; higher means more likely spam."""
+    score = 0
+    links = len(URL_PATTERN.findall(message))
+    if links >= 3:
+        score += 2
+    elif links:
+        score += 1
+    if URL_PATTERN.search(name) or URL_PATTERN.search(subject):
+        score += 2
+    score += min(len(SPAM_WORDS.findall(f"{subject} {message}")), 3)
+    letters = [c for c in message if c.isalpha()]
+    if len(letters) > 20 and sum(c.isupper() for c in letters) / len(letters) > 0.7:
+        score += 1
+    if re.search(r'(.)\1{9,}', message):
+        score += 1
+    if email.rsplit('@', 1)[-1].lower() in DISPOSABLE_DOMAINS:
+        score += 1
+    return score
+
+
+class RecentFingerprints:
+    """Bounded, time-limited set of recently seen fingerprints."""
+
+    def __init__(self, max_entries=RECENT_FINGERPRINTS, window=DUPLICATE_WINDOW_SECONDS):
+        self.max_entries = max_entries
+        self.window = window
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, fp):
+        """Record ``fp``; return True if it was already seen within the window."""
+        now = time.monotonic()
+        with self._lock:
+            first_seen = self._seen.get(fp)
+            if first_seen is not None and now - first_seen < self.window:
+                self._seen.move_to_end(fp)
+                return True
+            self._seen[fp] = now
+            self._seen.move_to_end(fp)
+            while len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+            return False
+
+    def forget(self, fp):
+        with self._lock:
+            self._seen.pop(fp, None)
+
+
+recent_fingerprints = RecentFingerprints()
+
+_indexed = False
+
+
+def fingerprint_document(fp):
+    return {
+        '_id': fp,
+        'expires_at': datetime.utcnow() + timedelta(seconds=DUPLICATE_WINDOW_SECONDS),
+    }
+
+
+def is_duplicate(db, fp):
+    """Check the in-memory window, then claim ``fp`` in MongoDB.
+
+    The fingerprint is the document _id, so the unique index rejects a
+    second claim from any worker until the TTL index removes it.
+    """
+    global _indexed
+    if recent_fingerprints.seen(fp):
+        metrics.incr('contact_duplicates')
+        return True
+    collection = db[FINGERPRINT_COLLECTION]
+    if not _indexed:
+        collection.create_index('expires_at', expireAfterSeconds=0)
+        _indexed = True
+    try:
+        collection.insert_one(fingerprint_document(fp))
+    except DuplicateKeyError:
+        metrics.incr('contact_duplicates')
+        return True
+    return False
+
+
+def release_fingerprint(db, fp):
+    """Undo is_duplicate()'s claim on ``fp`` for a contact that wasn't stored.
+
+    The delete runs in an empty context, outside the request's MongoDB
+    deadline, which may be what failed the insert.
+    """
+    recent_fingerprints.forget(fp)
+    contextvars.Context().run(db[FINGERPRINT_COLLECTION].delete_one, {'_id': fp})
+
+
+def classify(contact_doc):
+    """Add fingerprint, spam_score and is_spam fields to a contact document."""
+    contact_doc['fingerprint'] = fingerprint(
+        contact_doc['email'], contact_doc['subject'], contact_doc['message'],
+        contact_doc.get('tenant_id', '')
+    )
+    contact_doc['spam_score'] = spam_score(
+        contact_doc['name'], contact_doc['email'], contact_doc['subject'], contact_doc['message']
+    )
+    contact_doc['is_spam'] = contact_doc['spam_score'] >= SPAM_THRESHOLD
+    if contact_doc['is_spam']:
+        metrics.incr('contact_spam')
+    return contact_doc
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Static Asset Serving
+
+Files under static/ are served with content-hash ETags, range support and,
+when present, precompressed ``.br`` / ``.gz`` siblings. Filenames that
+carry a content hash (``name.<hex>.ext``, as written by thumbnails.py)
+are cached as immutable for a year.
+
+Precompressed siblings are written ahead of time:
+
+    python static_assets.py precompress
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import sys
+import threading
+from mimetypes import guess_type
+
+from flask import abort, request, send_from_directory
+from werkzeug.security import safe_join
+
+from compression import COMPRESSIBLE_MIMETYPES, COMPRESS_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only .gz siblings are written
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+# Cache lifetime for files without a content hash in their name (seconds).
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 3600))
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.[^./]+$')
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+class ETagCache:
+    """Content digests of files, recomputed only when size or mtime change."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        etag = digest.hexdigest()[:32]
+        with self._lock:
+            self._entries[path] = (key, etag)
+        return etag
+
+
+etags = ETagCache()
+
+
+def is_hashed_name(filename):
+    return bool(HASHED_NAME.search(filename))
+
+
+def _precompressed_variant(filename):
+    """(encoding, filename) of the best precompressed sibling the client accepts."""
+    available = [
+        (encoding, filename + suffix) for encoding, suffix in PRECOMPRESSED
+        if os.path.isfile(safe_join(STATIC_DIR, filename + suffix))
+    ]
+    if not available:
+        return None, filename
+    best = request.accept_encodings.best_match([encoding for encoding, _ in available])
+    for encoding, variant in available:
+        if encoding == best:
+            return encoding, variant
+    return None, filename
+
+
+def serve_static(filename):
+    """send_from_directory with hash ETags, long-lived caching and precompressed files."""
+    path = safe_join(STATIC_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    encoding, served = _precompressed_variant(filename)
+    response = send_from_directory(
+        STATIC_DIR, served,
+        mimetype=guess_type(filename)[0] or 'application/octet-stream',
+        etag=etags.get(safe_join(STATIC_DIR, served)),
+        conditional=True,
+        max_age=IMMUTABLE_MAX_AGE if is_hashed_name(filename) else STATIC_MAX_AGE,
+    )
+    if is_hashed_name(filename):
+        response.cache_control.immutable = True
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def precompress(static_dir=STATIC_DIR):
+    """Write .gz (and .br, if brotli is installed) next to compressible files.
+
+    Siblings newer than their source are left alone. Returns the number
+    of files written.
+    """
+    written = 0
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            if name.endswith(('.gz', '.br')):
+                continue
+            if guess_type(name)[0] not in COMPRESSIBLE_MIMETYPES:
+                continue
+            path = os.path.join(root, name)
+            if os.path.getsize(path) < COMPRESS_MIN_SIZE:
+                continue
+            with open(path, 'rb') as f:
+                body = f.read()
+            outputs = [('.gz', lambda b: gzip.compress(b, compresslevel=9, mtime=0))]
+            if brotli:
+                outputs.append(('.br', lambda b: brotli.compress(b, quality=11)))
+            for suffix, compress in outputs:
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                with open(target, 'wb') as f:
+                    f.write(compress(body))
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ['precompress']:
+        sys.exit("usage: python static_assets.py precompress")
+    print(f"Wrote {precompress()} precompressed files in {STATIC_DIR}")
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from pymongo import DeleteMany, ReplaceOne
+
+from models import technology_key
+from tenancy import current_tenant, scoped
+
+USAGE_COLLECTION = 'technology_usage'
+
+
+def usage_key(name, tenant_id=None):
+    """Index key for a technology name (case-insensitive) within a tenant."""
+    return f"{tenant_id or current_tenant()}:{technology_key(name)}"
+
+
+def rebuild_technology_usage(db, tenant_id=None):
+    """Recompute one tenant's technology -> projects/experience inverted index.
+
+    Call after seeding or after any write to projects, experience or
+    technologies. Returns the number of technologies indexed.
+    """
+    tenant_id = tenant_id or current_tenant()
+    query = scoped(tenant_id=tenant_id)
+    usage = {}
+
+    def entry(name):
+        key = usage_key(name, tenant_id)
+        if key not in usage:
+            usage[key] = {
+                '_id': key,
+                'tenant_id': tenant_id,
+                'name': name,
+                'projects': [],
+                'experience': [],
+            }
+        return usage[key]
+
+    for tech in db.technologies.find(query, {'name': 1}):
+        if tech.get('name'):
+            entry(tech['name'])
+
+    for project in db.projects.find(query, {'title': 1, 'technologies': 1}):
+        for name in set(project.get('technologies') or []):
+            entry(name)['projects'].append({
+                'id': str(project['_id']),
+                'title': project.get('title'),
+            })
+
+    for exp in db.experience.find(query, {'title': 1, 'company': 1, 'technologies': 1}):
+        for name in set(exp.get('technologies') or []):
+            entry(name)['experience'].append({
+                'id': str(exp['_id']),
+                'title': exp.get('title'),
+                'company': exp.get('company'),
+            })
+
+    now = datetime.utcnow()
+    requests = []
+    for doc in usage.values():
+        doc['project_count'] = len(doc['projects'])
+        doc['experience_count'] = len(doc['experience'])
+        doc['total'] = doc['project_count'] + doc['experience_count']
+        doc['updated_at'] = now
+        requests.append(ReplaceOne({'_id': doc['_id']}, doc, upsert=True))
+    requests.append(DeleteMany(scoped({'_id': {'$nin': list(usage)}}, tenant_id)))
+
+    db[USAGE_COLLECTION].bulk_write(requests, ordered=False)
+    return len(usage)
+
+
+def get_technology_usage(db, name):
+    """Return the current tenant's usage document for ``name`` or None."""
+    return db[USAGE_COLLECTION].find_one({'_id': usage_key(name)})
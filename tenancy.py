@@ -0,0 +1,219 @@
+"""
+Multi-portfolio (multi-tenant) support.
+
+Every document carries a ``tenant_id`` and every query is scoped with
+``scoped()``. The tenant of a request is resolved according to
+TENANCY_MODE:
+
+    single  every request belongs to DEFAULT_TENANT (the default)
+    host    the Host header is looked up in the ``tenants`` collection
+    path    /t/<tenant_id>/api/... ; the prefix is stripped before routing
+
+Tenants are registered in the ``tenants`` collection by ``seed.py
+--tenant``. Per-tenant in-memory state (search index, skills view) lives
+in TenantCache, which keeps only the most recently used tenants.
+"""
+
+import contextvars
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, jsonify, request
+
+from models import mongo
+
+TENANCY_MODE = os.environ.get('TENANCY_MODE', 'single')
+DEFAULT_TENANT = os.environ.get('DEFAULT_TENANT', 'default')
+# Tenants whose derived views are kept in memory per process.
+TENANT_CACHE_SIZE = int(os.environ.get('TENANT_CACHE_SIZE', 64))
+# Seconds a host -> tenant lookup is remembered.
+TENANT_LOOKUP_TTL = int(os.environ.get('TENANT_LOOKUP_TTL', 300))
+
+TENANTS_COLLECTION = 'tenants'
+PATH_PREFIX = '/t/'
+TENANT_ID_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]{0,62}$')
+ENVIRON_KEY = 'portfolio.tenant'
+
+# Collections whose documents belong to a tenant.
+TENANT_COLLECTIONS = (
+    'developer', 'technologies', 'skills', 'projects', 'experience', 'education',
+    'certifications', 'achievements', 'site_settings', 'contacts', 'technology_usage',
+)
+
+_current = contextvars.ContextVar('tenant_id', default=DEFAULT_TENANT)
+
+
+def current_tenant():
+    return _current.get()
+
+
+def use_tenant(tenant_id):
+    """Make ``tenant_id`` current; returns a token for ``reset_tenant``."""
+    return _current.set(tenant_id)
+
+
+def reset_tenant(token):
+    _current.reset(token)
+
+
+def scoped(query=None, tenant_id=None):
+    """``query`` restricted to the current (or given) tenant."""
+    scoped_query = dict(query or {})
+    scoped_query['tenant_id'] = tenant_id or current_tenant()
+    return scoped_query
+
+
+def valid_tenant_id(tenant_id):
+    return bool(tenant_id and TENANT_ID_PATTERN.match(tenant_id))
+
+
+class TenantCache:
+    """Bounded LRU of per-tenant values, optionally expiring after ``ttl``."""
+
+    def __init__(self, max_entries=TENANT_CACHE_SIZE, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if self.ttl is not None and time.monotonic() - entry[1] >= self.ttl:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_MISSING = object()
+_host_tenants = TenantCache(max_entries=4096, ttl=TENANT_LOOKUP_TTL)
+_known_tenants = TenantCache(max_entries=4096, ttl=TENANT_LOOKUP_TTL)
+
+
+def _normalize_host(host):
+    return (host or '').split(':', 1)[0].strip().lower().rstrip('.')
+
+
+def tenant_for_host(host):
+    host = _normalize_host(host)
+    tenant_id = _host_tenants.get(host, _MISSING)
+    if tenant_id is _MISSING:
+        doc = mongo.db[TENANTS_COLLECTION].find_one({'hosts': host}, {'_id': 1})
+        tenant_id = doc['_id'] if doc else None
+        _host_tenants.set(host, tenant_id)
+    return tenant_id
+
+
+def tenant_exists(tenant_id):
+    if not valid_tenant_id(tenant_id):
+        return False
+    known = _known_tenants.get(tenant_id, _MISSING)
+    if known is _MISSING:
+        known = mongo.db[TENANTS_COLLECTION].find_one({'_id': tenant_id}, {'_id': 1}) is not None
+        _known_tenants.set(tenant_id, known)
+    return known
+
+
+def resolve(host, path):
+    """(tenant_id, path without any tenant prefix); tenant_id is None if unknown."""
+    if TENANCY_MODE == 'host':
+        return tenant_for_host(host), path
+    if TENANCY_MODE == 'path':
+        if not path.startswith(PATH_PREFIX):
+            return None, path
+        tenant_id, _, rest = path[len(PATH_PREFIX):].partition('/')
+        if not tenant_exists(tenant_id):
+            return None, path
+        return tenant_id, '/' + rest
+    return DEFAULT_TENANT, path
+
+
+def register_tenant(db, tenant_id, hosts=(), name=None):
+    """Create or update a tenant and the hosts that map to it."""
+    if not valid_tenant_id(tenant_id):
+        raise ValueError(f"Invalid tenant id {tenant_id!r}")
+    hosts = sorted({_normalize_host(h) for h in hosts if h})
+    update = {'$set': {'name': name or tenant_id}}
+    if hosts:
+        update['$addToSet'] = {'hosts': {'$each': hosts}}
+    db[TENANTS_COLLECTION].update_one({'_id': tenant_id}, update, upsert=True)
+    db[TENANTS_COLLECTION].create_index('hosts', unique=True, sparse=True)
+    _known_tenants.pop(tenant_id)
+    for host in hosts:
+        _host_tenants.pop(host)
+
+
+def assign_default_tenant(db):
+    """Stamp DEFAULT_TENANT on documents written before tenancy existed.
+
+    Returns the number of documents updated.
+    """
+    updated = 0
+    for name in TENANT_COLLECTIONS:
+        result = db[name].update_many(
+            {'tenant_id': {'$exists': False}}, {'$set': {'tenant_id': DEFAULT_TENANT}}
+        )
+        updated += result.modified_count
+    return updated
+
+
+class TenantMiddleware:
+    """Resolve the tenant before Flask routing and strip any path prefix.
+
+    Unknown tenants are answered with 404 without entering Flask.
+    """
+
+    def __init__(self, app, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        tenant_id, routed_path = resolve(environ.get('HTTP_HOST', ''), path)
+        if tenant_id is None:
+            with self.app.app_context():
+                response = jsonify({"error": "Portfolio not found"})
+            response.status_code = 404
+            return response(environ, start_response)
+        if routed_path != path:
+            environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + path[:len(path) - len(routed_path)]
+            environ['PATH_INFO'] = routed_path
+        environ[ENVIRON_KEY] = tenant_id
+        return self.wsgi_app(environ, start_response)
+
+
+def _before_request():
+    g.tenant_token = use_tenant(request.environ.get(ENVIRON_KEY, DEFAULT_TENANT))
+
+
+def _teardown_request(exc):
+    token = g.pop('tenant_token', None)
+    if token is not None:
+        reset_tenant(token)
+
+
+def init_tenancy(app):
+    app.wsgi_app = TenantMiddleware(app, app.wsgi_app)
+    app.before_request(_before_request)
+    app.teardown_request(_teardown_request)
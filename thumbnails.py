@@ -0,0 +1,105 @@
+"""
+Project image thumbnails, generated at seed time.
+
+Every local image referenced by a project (``image_url`` and ``images``)
+is resized to THUMBNAIL_WIDTHS and written as WebP, plus AVIF when the
+installed Pillow can encode it, into static/thumbs/. Output names include
+a digest of the source bytes and settings, so existing files are reused
+and can be served as immutable. Pillow is optional: without it projects
+are seeded with no thumbnails.
+"""
+
+import hashlib
+import os
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional
+    Image = None
+
+from static_assets import STATIC_DIR
+
+THUMBNAIL_DIR = os.path.join(STATIC_DIR, 'thumbs')
+THUMBNAIL_WIDTHS = tuple(
+    int(w) for w in os.environ.get('THUMBNAIL_WIDTHS', '320,640').split(',') if w.strip()
+)
+THUMBNAIL_QUALITY = 75
+
+
+def available_formats():
+    """Output formats the installed Pillow can write, best first."""
+    if Image is None:
+        return []
+    formats = []
+    if features.check('avif'):
+        formats.append('avif')
+    if features.check('webp'):
+        formats.append('webp')
+    return formats
+
+
+def _local_path(url):
+    """Filesystem path of a /static/ URL, or None for anything else."""
+    if not url or not url.startswith('/static/'):
+        return None
+    path = os.path.normpath(os.path.join(STATIC_DIR, url[len('/static/'):]))
+    if not path.startswith(STATIC_DIR + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def _source_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def thumbnails_for(url, widths=THUMBNAIL_WIDTHS, formats=None):
+    """Create (or reuse) thumbnails of one image; returns their descriptors."""
+    path = _local_path(url)
+    formats = available_formats() if formats is None else formats
+    if path is None or not formats:
+        return []
+
+    source_digest = _source_digest(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+
+    variants = []
+    with Image.open(path) as image:
+        image.load()
+        # Never upscale; widths past the original collapse into one.
+        for target_width in sorted({min(width, image.width) for width in widths}):
+            height = round(image.height * target_width / image.width)
+            resized = None
+            for fmt in formats:
+                digest = hashlib.sha256(
+                    f"{source_digest}:{target_width}:{fmt}:{THUMBNAIL_QUALITY}".encode()
+                ).hexdigest()[:12]
+                name = f"{stem}-{target_width}w.{digest}.{fmt}"
+                target = os.path.join(THUMBNAIL_DIR, name)
+                if not os.path.exists(target):
+                    if resized is None:
+                        resized = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+                        resized = resized.resize((target_width, height), Image.LANCZOS)
+                    resized.save(target + '.tmp', format=fmt.upper(), quality=THUMBNAIL_QUALITY)
+                    os.replace(target + '.tmp', target)
+                variants.append({
+                    'src': url,
+                    'url': f"/static/thumbs/{name}",
+                    'width': target_width,
+                    'height': height,
+                    'format': fmt,
+                })
+    return variants
+
+
+def add_thumbnails(projects):
+    """Set ``thumbnails`` on each project document from its local images."""
+    formats = available_formats()
+    for project in projects:
+        sources = [project.get('image_url')] + list(project.get('images') or [])
+        thumbnails = []
+        for url in dict.fromkeys(filter(None, sources)):
+            thumbnails.extend(thumbnails_for(url, formats=formats))
+        project['thumbnails'] = thumbnails
+    return projects
@@ -0,0 +1,205 @@
+"""
+Content versions for delta sync.
+
+Each tenant has a counter in ``content_versions``. Every write takes the
+next value and stamps it on the documents it touches as ``version``;
+deletions leave a tombstone with the version that removed them. A client
+that remembers the last version it saw asks for ``?since=<version>`` and
+gets back only what changed.
+
+Versions are allocated before the write lands, and concurrent writers can
+finish out of order, so the counter alone is not a safe resume point. A
+write holds its version in the tenant's ``pending`` list until it is done
+(see ``versioned_write``), and readers only hand out the committed
+watermark: the highest version below every write still in flight.
+
+Reseeding replaces every document, so it raises the tenant's ``floor``:
+clients whose version is below the floor get a full response instead of
+a delta. Expired and archived contacts are tombstoned by retention.py,
+which also raises the floor if its TTL backstop may have deleted some
+first.
+"""
+
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from tenancy import current_tenant, scoped
+
+VERSIONS_COLLECTION = 'content_versions'
+TOMBSTONES_COLLECTION = 'tombstones'
+
+# Collections whose documents carry a version.
+VERSIONED_COLLECTIONS = (
+    'developer', 'technologies', 'skills', 'projects', 'experience', 'education',
+    'certifications', 'achievements', 'site_settings', 'contacts',
+)
+# Seconds after which an unfinished write is presumed dead and stops
+# holding back the watermark.
+PENDING_WRITE_SECONDS = int(os.environ.get('PENDING_WRITE_SECONDS', 60))
+
+
+def version_claim(state, tenant_id):
+    """(filter, update, version) claiming the version after ``state``.
+
+    The filter matches only while the counter is unchanged, so with
+    upsert=True a concurrent claim makes this one fail with
+    DuplicateKeyError; re-read the state and try again. Shared with the
+    async app.
+    """
+    current = state.get('version') if state else None
+    version = (current or 0) + 1
+    return (
+        {'_id': tenant_id, 'version': current},
+        {'$set': {'version': version}, '$push': {'pending': {'version': version, 'at': datetime.utcnow()}}},
+        version,
+    )
+
+
+def version_release(version, tenant_id):
+    """(filter, update) marking ``version`` as written."""
+    return {'_id': tenant_id}, {'$pull': {'pending': {'version': version}}}
+
+
+def has_dead_writes(state):
+    """Whether ``state`` holds claims whose writer never finished."""
+    stale = stale_before()
+    return any(p['at'] < stale for p in (state or {}).get('pending', []))
+
+
+def dead_writes_cleanup(tenant_id):
+    """(filter, update) forgetting dead claims; readers already ignore them."""
+    return {'_id': tenant_id}, {'$pull': {'pending': {'at': {'$lt': stale_before()}}}}
+
+
+def stale_before():
+    return datetime.utcnow() - timedelta(seconds=PENDING_WRITE_SECONDS)
+
+
+def begin_write(db, tenant_id=None):
+    """Allocate the next version for a tenant and hold it until end_write()."""
+    tenant_id = tenant_id or current_tenant()
+    while True:
+        state = db[VERSIONS_COLLECTION].find_one({'_id': tenant_id}, {'version': 1})
+        query, update, version = version_claim(state, tenant_id)
+        try:
+            db[VERSIONS_COLLECTION].update_one(query, update, upsert=True)
+            return version
+        except DuplicateKeyError:
+            continue
+
+
+def end_write(db, version, tenant_id=None):
+    tenant_id = tenant_id or current_tenant()
+    query, update = version_release(version, tenant_id)
+    state = db[VERSIONS_COLLECTION].find_one_and_update(query, update, {'pending': 1})
+    if has_dead_writes(state):
+        db[VERSIONS_COLLECTION].update_one(*dead_writes_cleanup(tenant_id))
+
+
+@contextmanager
+def versioned_write(db, tenant_id=None):
+    """Version for the writes made inside the block.
+
+    Readers don't advance past it until the block exits, so stamp and
+    tombstone everything inside.
+    """
+    tenant_id = tenant_id or current_tenant()
+    version = begin_write(db, tenant_id)
+    try:
+        yield version
+    finally:
+        end_write(db, version, tenant_id)
+
+
+def committed_version(state):
+    """Highest version that every write at or below has finished."""
+    if not state:
+        return 0
+    stale = stale_before()
+    in_flight = [p['version'] for p in state.get('pending', []) if p['at'] >= stale]
+    return min(in_flight) - 1 if in_flight else state.get('version', 0)
+
+
+def raise_floor(db, version, tenant_id=None):
+    """Make clients older than ``version`` resync in full."""
+    db[VERSIONS_COLLECTION].update_one(
+        {'_id': tenant_id or current_tenant()}, {'$max': {'floor': version}}, upsert=True
+    )
+
+
+def ensure_versioned(db, tenant_id=None):
+    """Stamp a version on documents written before versioning existed.
+
+    Returns the tenant's {'version', 'floor'} state.
+    """
+    tenant_id = tenant_id or current_tenant()
+    state = db[VERSIONS_COLLECTION].find_one({'_id': tenant_id})
+    if state is not None and 'floor' in state:
+        return state
+    with versioned_write(db, tenant_id) as version:
+        for name in VERSIONED_COLLECTIONS:
+            db[name].update_many(
+                scoped({'version': {'$exists': False}}, tenant_id), {'$set': {'version': version}}
+            )
+        raise_floor(db, version, tenant_id)
+    return db[VERSIONS_COLLECTION].find_one({'_id': tenant_id})
+
+
+def record_deletes(db, collection, ids, version, tenant_id=None):
+    """Leave a tombstone for each deleted document id."""
+    if not ids:
+        return
+    tenant_id = tenant_id or current_tenant()
+    db[TOMBSTONES_COLLECTION].insert_many([
+        {'tenant_id': tenant_id, 'collection': collection, 'doc_id': str(doc_id), 'version': version}
+        for doc_id in ids
+    ])
+
+
+def parse_since(value):
+    try:
+        since = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("since must be a non-negative integer")
+    if since < 0:
+        raise ValueError("since must be a non-negative integer")
+    return since
+
+
+def changes_since(db, collection, since, query, formatter, sort=None):
+    """Documents matching ``query`` changed after ``since``, plus deleted ids.
+
+    ``version`` in the result is what the client sends as ``since`` next
+    time. When ``full`` is true the client should replace its copy with
+    ``upserted`` rather than merge.
+    """
+    # Every write at or below the watermark is finished before the state is
+    # read, so the queries below see all of them; later ones are left for
+    # the next request.
+    state = ensure_versioned(db)
+    version = committed_version(state)
+    full = since < state.get('floor', 0)
+
+    query = dict(query)
+    if not full:
+        query['version'] = {'$gt': since, '$lte': version}
+    cursor = db[collection].find(query)
+    if sort:
+        cursor = cursor.sort(*sort)
+    upserted = [formatter(doc) for doc in cursor]
+
+    deleted = []
+    if not full:
+        deleted = [t['doc_id'] for t in db[TOMBSTONES_COLLECTION].find(
+            scoped({'collection': collection, 'version': {'$gt': since, '$lte': version}}), {'doc_id': 1}
+        )]
+    return {
+        'version': version,
+        'since': since,
+        'full': full,
+        'upserted': upserted,
+        'deleted': deleted,
+    }